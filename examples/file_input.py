@@ -3,34 +3,18 @@
 from simphony_osp.namespaces import simlammps
 from simphony_osp.wrappers import SimLAMMPS
 
-from simphony_osp_simlammps.utils import LAMMPSInputScript
-
-lammps_session = SimLAMMPS("examples/data_input_from_sim.lammps")
+from simphony_osp_simlammps import materialize_atoms
+
+# LAMMPS reads the data file itself. The simulation box and the materials
+# are added to the session, the atoms are added later on request. The
+# settings of the data file are kept: the mass is 1 and all the faces of the
+# box are periodic (an earlier version of this example built the atoms in
+# the session, with a mass of 0.2 and a fixed x boundary).
+lammps_session = SimLAMMPS(data_file="examples/data_input_from_sim.lammps")
 lammps_session.locked = True
 
 with lammps_session:
-    mass = simlammps.Mass(value=0.2)
-    material = simlammps.Material()
-
-    material[simlammps.hasPart] += mass
-
-    input_file = LAMMPSInputScript("examples/data_input_from_sim.lammps")
-    input_file.parse()
-
-    for coordinates, velocity in input_file.atom_information_generator():
-        particle = simlammps.Atom()
-        position = simlammps.Position(vector=coordinates)
-        velocity = simlammps.Velocity(vector=velocity)
-        particle[simlammps.hasPart] += {material, position, velocity}
-
-    vector_x, vector_y, vector_z = input_file.box_coordinates()
-    box = simlammps.SimulationBox()
-    face_x = simlammps.FaceX(vector=vector_x)
-    face_y = simlammps.FaceY(vector=vector_y)
-    face_y[simlammps.hasPart] += simlammps.Periodic()
-    face_z = simlammps.FaceZ(vector=vector_z)
-    face_z[simlammps.hasPart] += simlammps.Periodic()
-    box[simlammps.hasPart] += {face_x, face_y, face_z}
+    material = lammps_session.get(oclass=simlammps.Material).one()
 
     md_nve = simlammps.MolecularDynamics()
 
@@ -54,6 +38,10 @@ with lammps_session:
     video = simlammps.Video(steps=10, width=640, height=480)
 lammps_session.compute()
 
+# Add the first 10 atoms to the session.
+for particle in materialize_atoms(lammps_session, 10):
+    print(particle.get(oclass=simlammps.Position).one().vector)
+
 # Update the box dimensions
 proxy_box = lammps_session.get(oclass=simlammps.SimulationBox).one()
 proxy_box.get(oclass=simlammps.FaceX).one().vector = (15, 0, 0)
@@ -1,6 +1,44 @@
 """LAMMPS wrapper for the SimPhoNy OSP."""
 
-from simphony_osp_simlammps.utils import LAMMPSInputScript
-from simphony_osp_simlammps.wrapper import SimLAMMPS
+from simphony_osp_simlammps.ensemble import EnsembleResult, run_ensemble
+from simphony_osp_simlammps.pool import EnginePool
+from simphony_osp_simlammps.snapshot import Snapshot
+from simphony_osp_simlammps.utils import (
+    LAMMPSInputScript,
+    LAMMPSTrajectory,
+    RingBuffer,
+    TrajectoryFrame,
+)
+from simphony_osp_simlammps.views import AtomViews
+from simphony_osp_simlammps.wrapper import (
+    SimLAMMPS,
+    add_atoms,
+    atom_views,
+    compute_async,
+    materialize_atoms,
+    save_checkpoint,
+    subscribe,
+    time_series,
+    tune_neighbor,
+)
 
-__all__ = ["LAMMPSInputScript", "SimLAMMPS"]
+__all__ = [
+    "AtomViews",
+    "EnginePool",
+    "EnsembleResult",
+    "LAMMPSInputScript",
+    "LAMMPSTrajectory",
+    "RingBuffer",
+    "SimLAMMPS",
+    "Snapshot",
+    "TrajectoryFrame",
+    "add_atoms",
+    "atom_views",
+    "compute_async",
+    "materialize_atoms",
+    "run_ensemble",
+    "save_checkpoint",
+    "subscribe",
+    "time_series",
+    "tune_neighbor",
+]
@@ -0,0 +1,212 @@
+"""Run ensembles of independent LAMMPS simulations in parallel."""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import product
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import numpy as np
+from simphony_osp.ontology import OntologyIndividual
+from simphony_osp.session import Session
+from simphony_osp.utils.datatypes import Identifier
+
+from simphony_osp_simlammps.pool import EnginePool
+from simphony_osp_simlammps.wrapper import SimLAMMPS
+
+Parameter = Tuple[Union[OntologyIndividual, Identifier], str]
+"""An individual (or its identifier) and the name of one of its attributes.
+
+For example, `(lj, "energyWellDepth")`.
+"""
+
+
+class EnsembleResult(NamedTuple):
+    """Results of one of the simulations of an ensemble."""
+
+    index: int
+    """Position of the combination of parameter values in the grid."""
+
+    parameters: Dict[Tuple[Identifier, str], Any]
+    """Values of the parameters for the simulation."""
+
+    identifiers: np.ndarray
+    """Identifiers of the atoms, as strings."""
+
+    values: Dict[str, np.ndarray]
+    """Per-atom quantities, with one row per atom following `identifiers`."""
+
+
+def run_ensemble(
+    template: Session,
+    grid: Mapping[Parameter, Iterable[Any]],
+    quantities: Iterable[str] = ("position",),
+    max_workers: Optional[int] = None,
+    **kwargs,
+) -> Iterator[EnsembleResult]:
+    """Runs one simulation for each combination of parameter values.
+
+    The simulations are spread across a pool of worker processes. Each
+    worker loads the template into a new SimLAMMPS session, sets the
+    parameter values, runs the simulation and sends back the requested
+    per-atom quantities as arrays. Each worker keeps one LAMMPS instance
+    and resets it between simulations.
+
+    Args:
+        template: session with the simulation inputs (it does not need to
+            be a SimLAMMPS session).
+        grid: values to try for each parameter (see `Parameter`). One
+            simulation runs for every combination of values.
+        quantities: per-atom quantities to send back (see
+            `SimLAMMPS.QUANTITIES`).
+        max_workers: number of worker processes. As many as processors
+            when not specified.
+        kwargs: keyword arguments for the SimLAMMPS sessions. The session
+            is not updated after the run unless `sync` is given.
+
+    Returns:
+        An iterator of the results of the simulations as they finish, in no
+        particular order. The simulations start when it is first advanced.
+
+    Raises:
+        ValueError: when one of the quantities is not supported. The error
+            is raised right away, before any simulation starts.
+    """
+    quantities = tuple(quantities)
+    for quantity in quantities:
+        if quantity not in SimLAMMPS.QUANTITIES:
+            raise ValueError(
+                f"Unsupported quantity {quantity}, choose among "
+                f"{', '.join(SimLAMMPS.QUANTITIES)}."
+            )
+    kwargs.setdefault("sync", ())
+    keys = [
+        (
+            individual.identifier
+            if isinstance(individual, OntologyIndividual)
+            else individual,
+            str(name),
+        )
+        for individual, name in grid
+    ]
+    combinations = [
+        dict(zip(keys, values))
+        for values in product(*(tuple(values) for values in grid.values()))
+    ]
+    return _run_ensemble(
+        template.graph.serialize(format="nt"),
+        combinations,
+        quantities,
+        max_workers,
+        kwargs,
+    )
+
+
+def _run_ensemble(
+    data: str,
+    combinations: List[Dict[Tuple[Identifier, str], Any]],
+    quantities: Tuple[str, ...],
+    max_workers: Optional[int],
+    kwargs: Dict[str, Any],
+) -> Iterator[EnsembleResult]:
+    """Runs the simulations of an ensemble on a pool of worker processes.
+
+    Use `run_ensemble` instead of calling this function directly.
+
+    Args:
+        data: the template, as N-Triples.
+        combinations: values of the parameters for each simulation.
+        quantities: per-atom quantities to send back.
+        max_workers: number of worker processes.
+        kwargs: keyword arguments for the SimLAMMPS sessions.
+
+    Yields:
+        The results of the simulations as they finish.
+    """
+    # LAMMPS and MPI should not be forked, start fresh workers instead.
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_initialize_worker,
+        initargs=(data, quantities, kwargs),
+    ) as executor:
+        futures = {
+            executor.submit(_run_simulation, parameters): (index, parameters)
+            for index, parameters in enumerate(combinations)
+        }
+        try:
+            for future in as_completed(futures):
+                index, parameters = futures[future]
+                identifiers, values = future.result()
+                yield EnsembleResult(index, parameters, identifiers, values)
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+_worker: Dict[str, Any] = dict()
+"""Template, quantities, session arguments and engine pool of a worker."""
+
+
+def _initialize_worker(
+    data: str, quantities: Tuple[str, ...], kwargs: Dict[str, Any]
+):
+    """Keeps the arguments shared by all simulations of a worker.
+
+    Args:
+        data: the template, as N-Triples.
+        quantities: per-atom quantities to send back.
+        kwargs: keyword arguments for the SimLAMMPS sessions.
+    """
+    _worker.update(
+        data=data,
+        quantities=quantities,
+        kwargs=kwargs,
+        pool=EnginePool(max_size=1, max_idle=None),
+    )
+
+
+def _run_simulation(
+    parameters: Dict[Tuple[Identifier, str], Any]
+) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """Runs one simulation of an ensemble.
+
+    Args:
+        parameters: values of the parameters for the simulation.
+
+    Returns:
+        The identifiers of the atoms, as strings, and the requested
+        per-atom quantities.
+    """
+    # The session class is created from the entry points of the wrappers.
+    from simphony_osp.wrappers import SimLAMMPS as Simulation
+
+    session = Simulation(pool=_worker["pool"], **_worker["kwargs"])
+    try:
+        session.graph.parse(data=_worker["data"], format="nt")
+        for (identifier, name), value in parameters.items():
+            setattr(session.from_identifier(identifier), name, value)
+        session.compute()
+
+        interface = session.driver.interface
+        ids = np.sort(interface._atom_mapper.ids())
+        identifiers = interface._atom_mapper.get_many(ids).astype(str)
+        values = {
+            quantity: interface._gather_atoms(
+                SimLAMMPS.QUANTITIES[quantity][1], ids
+            )
+            for quantity in _worker["quantities"]
+        }
+    finally:
+        session.close()
+    return identifiers, values
@@ -1,20 +1,39 @@
 """Map an ontology individual identifier to a LAMMPS id."""
 
-from typing import Union
+from typing import BinaryIO, Iterable, Optional, Union
 
+import numpy as np
+from rdflib import BNode, URIRef
 from simphony_osp.utils.datatypes import Identifier
 
 
 class Mapper:
     """Maps an ontology individual identifier to a LAMMPS id.
 
-    Uses an increasing counter.
+    Uses an increasing counter, reusing the ids that are freed when
+    entries are removed (the smallest free ids are reused first).
+
+    The entries are stored compactly: the identifiers and their ids are
+    kept in "slots" of two contiguous arrays, an integer array maps each
+    id to its slot, and a dictionary maps each identifier to its id.
     """
 
     def __init__(self):
         """Constructor."""
-        self._to_ontology = dict()
+        # identifier -> id
         self._to_lammps = dict()
+        # slot -> identifier
+        self._identifiers = np.empty(0, dtype=object)
+        # slot -> id
+        self._ids = np.empty(0, dtype=np.int64)
+        # id -> slot (-1 when the id is not in use)
+        self._slots = np.empty(0, dtype=np.int64)
+        # Freed ids, sorted.
+        self._free = np.empty(0, dtype=np.int64)
+        # Number of used slots.
+        self._size = 0
+        # Smallest id that has never been assigned.
+        self._next = 0
 
     def add(self, identifier: Identifier) -> int:
         """Adds a new entry to the mapper.
@@ -29,17 +48,81 @@ class Mapper:
         Returns:
             pylammps id assigned to the identifier.
         """
-        if not isinstance(identifier, Identifier):
-            message = "{} is not a proper identifier"
-            raise TypeError(message.format(identifier))
-        if identifier in self._to_lammps:
-            message = "identifier {} already in the mapper"
-            raise ValueError(message.format(identifier))
-
-        lammps = len(self._to_ontology)
-        self._to_ontology[lammps] = identifier
-        self._to_lammps[identifier] = lammps
-        return lammps
+        return int(self.add_many((identifier,))[0])
+
+    def add_many(
+        self,
+        identifiers: Iterable[Identifier],
+        ids: Optional[Iterable[int]] = None,
+    ) -> np.ndarray:
+        """Adds several new entries to the mapper.
+
+        Args:
+            identifiers: identifiers to add to the mapper.
+            ids: pylammps ids for the identifiers, for atoms that the
+                engine already numbered. Assigned by the mapper when not
+                specified.
+
+        Raises:
+            TypeError: when one of the given arguments is not an identifier
+            ValueError: when one of the identifiers is already in the
+                mapper, or is repeated, or when the ids are wrong or in
+                use.
+
+        Returns:
+            pylammps ids assigned to the identifiers, in the same order.
+        """
+        identifiers = list(identifiers)
+        for identifier in identifiers:
+            if not isinstance(identifier, Identifier):
+                message = "{} is not a proper identifier"
+                raise TypeError(message.format(identifier))
+            if identifier in self._to_lammps:
+                message = "identifier {} already in the mapper"
+                raise ValueError(message.format(identifier))
+        if len(set(identifiers)) != len(identifiers):
+            raise ValueError("repeated identifiers cannot be added")
+
+        number = len(identifiers)
+        if ids is None:
+            reused = self._free[:number]
+            self._free = self._free[number:]
+            ids = np.concatenate(
+                (
+                    reused,
+                    np.arange(
+                        self._next,
+                        self._next + number - len(reused),
+                        dtype=np.int64,
+                    ),
+                )
+            )
+            self._next += number - len(reused)
+        else:
+            ids = np.asarray(ids, dtype=np.int64).ravel()
+            if (
+                len(ids) != number
+                or np.any(ids < 0)
+                or len(np.unique(ids)) != number
+            ):
+                raise ValueError("wrong or repeated ids cannot be added")
+            if any(x in self for x in ids[ids < self._next].tolist()):
+                raise ValueError("ids already in the mapper cannot be added")
+            # Ids skipped by the given ones become free.
+            end = max(self._next, int(ids.max(initial=-1)) + 1)
+            self._free = np.setdiff1d(
+                np.union1d(self._free, np.arange(self._next, end)), ids
+            )
+            self._next = end
+
+        self._reserve(self._size + number, self._next)
+        slots = np.arange(self._size, self._size + number)
+        self._identifiers[slots] = identifiers
+        self._ids[slots] = ids
+        self._slots[ids] = slots
+        self._size += number
+        self._to_lammps.update(zip(identifiers, ids.tolist()))
+        return ids
 
     def get(self, key: Union[int, Identifier]) -> Union[int, Identifier]:
         """Returns the equivalent lammps/ontology material id.
@@ -57,11 +140,42 @@ class Mapper:
             if isinstance(key, Identifier):
                 return self._to_lammps[key]
             else:
-                return self._to_ontology[key]
+                return self._identifiers[self._slot(key)]
         except KeyError:
             message = "{} is a wrong id."
             raise KeyError(message.format(key))
 
+    def get_many(
+        self, keys: Union[Iterable[int], Iterable[Identifier]]
+    ) -> np.ndarray:
+        """Returns the equivalent lammps/ontology ids of several keys.
+
+        Args:
+            keys: either lammps ids or individual ids (not mixed).
+
+        Raises:
+            KeyError: when one of the keys is not in the mapper.
+
+        Returns:
+            An integer array with the lammps ids when identifiers are
+            given, an object array with the identifiers otherwise.
+        """
+        if not isinstance(keys, np.ndarray):
+            keys = list(keys)
+        if not len(keys):
+            return np.empty(0, dtype=np.int64)
+        if isinstance(keys[0], Identifier):
+            try:
+                return np.fromiter(
+                    (self._to_lammps[key] for key in keys),
+                    dtype=np.int64,
+                    count=len(keys),
+                )
+            except KeyError as e:
+                message = "{} is a wrong id."
+                raise KeyError(message.format(e.args[0]))
+        return self._identifiers[self._slots_many(keys)]
+
     def remove(self, key: Union[int, Identifier]) -> None:
         """Removes the given key and the mapped id from the mapper.
 
@@ -74,23 +188,187 @@ class Mapper:
         try:
             if isinstance(key, Identifier):
                 lammps = self._to_lammps[key]
-                del self._to_lammps[key]
-                del self._to_ontology[lammps]
             else:
-                ontology = self._to_ontology[key]
-                del self._to_ontology[key]
-                del self._to_lammps[ontology]
+                lammps = key
+            slot = self._slot(lammps)
         except KeyError:
             message = "{} is a wrong id."
             raise KeyError(message.format(key))
+        identifier = self._identifiers[slot]
+
+        # Move the last used slot to the freed one.
+        last = self._size - 1
+        moved = self._ids[last]
+        self._identifiers[slot] = self._identifiers[last]
+        self._ids[slot] = moved
+        self._slots[moved] = slot
+        self._identifiers[last] = None
+        self._slots[lammps] = -1
+        self._size -= 1
+        del self._to_lammps[identifier]
+        self._free = np.insert(
+            self._free, np.searchsorted(self._free, lammps), lammps
+        )
+
+    def remove_many(
+        self, keys: Union[Iterable[int], Iterable[Identifier]]
+    ) -> np.ndarray:
+        """Removes several keys and their mapped ids from the mapper.
+
+        Args:
+            keys: either lammps ids or individual ids (not mixed).
+
+        Raises:
+            KeyError: when one of the keys is not in the mapper.
+
+        Returns:
+            The lammps ids that were removed.
+        """
+        if not isinstance(keys, np.ndarray):
+            keys = list(keys)
+        if len(keys) and isinstance(keys[0], Identifier):
+            ids = self.get_many(keys)
+        else:
+            ids = keys
+        slots = self._slots_many(ids)
+        ids = self._ids[slots]
+        if len(np.unique(ids)) != len(ids):
+            raise KeyError("repeated ids cannot be removed")
+
+        for identifier in self._identifiers[slots]:
+            del self._to_lammps[identifier]
+        keep = np.ones(self._size, dtype=bool)
+        keep[slots] = False
+        size = self._size - len(ids)
+        self._identifiers[:size] = self._identifiers[: self._size][keep]
+        self._identifiers[size : self._size] = None
+        self._ids[:size] = self._ids[: self._size][keep]
+        self._slots[ids] = -1
+        self._slots[self._ids[:size]] = np.arange(size)
+        self._size = size
+        self._free = np.union1d(self._free, ids)
+        return ids
+
+    def ids(self) -> np.ndarray:
+        """Returns all the lammps ids in the mapper.
+
+        Returns:
+            Array with the ids, in no particular order.
+        """
+        return self._ids[: self._size].copy()
+
+    def save(self, file: Union[str, BinaryIO]) -> None:
+        """Writes a snapshot of the mapper to a file.
+
+        The snapshot is a NumPy `.npz` archive with the used slots, the
+        freed ids and the counter, so that a mapper loaded from it assigns
+        the same ids as this one.
+
+        Args:
+            file: path or binary file to write to.
+        """
+        identifiers = self._identifiers[: self._size]
+        np.savez_compressed(
+            file,
+            identifiers=identifiers.astype(str),
+            blank=np.fromiter(
+                (isinstance(x, BNode) for x in identifiers),
+                dtype=bool,
+                count=self._size,
+            ),
+            ids=self._ids[: self._size],
+            free=self._free,
+            next=self._next,
+        )
+
+    @classmethod
+    def load(cls, file: Union[str, BinaryIO]) -> "Mapper":
+        """Reads a mapper from a snapshot written by `save`.
+
+        Args:
+            file: path or binary file to read from.
+
+        Returns:
+            The mapper, as it was when it was saved.
+        """
+        mapper = cls()
+        with np.load(file) as snapshot:
+            ids = snapshot["ids"]
+            identifiers = np.array(
+                [
+                    BNode(x) if blank else URIRef(x)
+                    for x, blank in zip(
+                        snapshot["identifiers"].tolist(), snapshot["blank"]
+                    )
+                ],
+                dtype=object,
+            )
+            mapper._next = int(snapshot["next"])
+            mapper._free = snapshot["free"].astype(np.int64)
+        mapper._reserve(len(ids), mapper._next)
+        mapper._identifiers[: len(ids)] = identifiers
+        mapper._ids[: len(ids)] = ids
+        mapper._slots[ids] = np.arange(len(ids))
+        mapper._size = len(ids)
+        mapper._to_lammps = dict(zip(identifiers.tolist(), ids.tolist()))
+        return mapper
 
     def __len__(self) -> int:
         """Length of the mapping."""
-        return len(self._to_ontology)
+        return self._size
 
     def __contains__(self, key: Union[int, Identifier]) -> bool:
         """Containment verification."""
         if isinstance(key, Identifier):
             return key in self._to_lammps
-        else:
-            return key in self._to_ontology
+        try:
+            self._slot(key)
+        except KeyError:
+            return False
+        return True
+
+    def _slot(self, lammps: int) -> int:
+        """Returns the slot of a lammps id.
+
+        Raises:
+            KeyError: when the id is not in the mapper.
+        """
+        if (
+            isinstance(lammps, (int, np.integer))
+            and 0 <= lammps < len(self._slots)
+            and self._slots[lammps] >= 0
+        ):
+            return int(self._slots[lammps])
+        raise KeyError(lammps)
+
+    def _slots_many(self, ids: Iterable[int]) -> np.ndarray:
+        """Returns the slots of several lammps ids.
+
+        Raises:
+            KeyError: when one of the ids is not in the mapper.
+        """
+        try:
+            ids = np.asarray(ids, dtype=np.int64)
+        except (TypeError, ValueError):
+            raise KeyError("{} are wrong ids.".format(ids))
+        valid = (ids >= 0) & (ids < len(self._slots))
+        slots = np.full(ids.shape, -1, dtype=np.int64)
+        slots[valid] = self._slots[ids[valid]]
+        if np.any(slots < 0):
+            message = "{} is a wrong id."
+            raise KeyError(message.format(ids[slots < 0][0]))
+        return slots
+
+    def _reserve(self, slots: int, ids: int) -> None:
+        """Grows the arrays to hold at least the given slots and ids."""
+        if slots > len(self._ids):
+            capacity = max(slots, 2 * len(self._ids))
+            identifiers = np.empty(capacity, dtype=object)
+            identifiers[: self._size] = self._identifiers[: self._size]
+            self._identifiers = identifiers
+            self._ids = np.resize(self._ids, capacity)
+        if ids > len(self._slots):
+            capacity = max(ids, 2 * len(self._slots))
+            slots = np.full(capacity, -1, dtype=np.int64)
+            slots[: len(self._slots)] = self._slots
+            self._slots = slots
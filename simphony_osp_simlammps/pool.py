@@ -0,0 +1,117 @@
+"""Pool of LAMMPS instances to reuse across sessions."""
+
+from threading import Lock
+from time import monotonic
+from typing import Any, Iterable, List, Optional, Tuple
+
+from lammps import PyLammps
+
+
+class EnginePool:
+    """Keeps the LAMMPS instances of closed sessions to reuse them.
+
+    Starting LAMMPS is much slower than resetting it with the `clear`
+    command. Sessions that share a pool hand their engine over to it when
+    they close, and take an idle engine with the same command-line
+    arguments from it when they open, if there is one.
+
+    Idle engines are evicted lazily: the pool only closes engines when one
+    is acquired or released. Call `clear` to close the idle engines of a
+    pool that is no longer used.
+    """
+
+    max_size: int
+    """Maximum number of idle engines to keep."""
+
+    max_idle: Optional[float]
+    """Seconds after which an idle engine may be closed. Never when `None`.
+
+    The engine is closed the next time an engine is acquired or released.
+    """
+
+    _engines: List[Tuple[float, Tuple[str, ...], Any, PyLammps]]
+    """Release time, arguments, communicator and idle engine, by time."""
+
+    def __init__(self, max_size: int = 4, max_idle: Optional[float] = 300):
+        """Initialize the pool.
+
+        Args:
+            max_size: maximum number of idle engines to keep. The engine
+                that has been idle for longest is closed to make room.
+            max_idle: seconds after which an idle engine is closed, the
+                next time an engine is acquired or released. They are kept
+                until the pool is full when not specified.
+        """
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self._engines = []
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        """Number of idle engines in the pool."""
+        return len(self._engines)
+
+    def acquire(self, cmdargs: Iterable[str] = (), comm=None) -> PyLammps:
+        """Takes an idle engine from the pool or starts a new one.
+
+        Args:
+            cmdargs: command-line arguments of the engine.
+            comm: MPI communicator of the engine.
+
+        Returns:
+            An engine in the state of a newly started one.
+        """
+        cmdargs = tuple(cmdargs)
+        with self._lock:
+            self._evict(monotonic())
+            # Take the engine released last, the others may be evicted.
+            for i in reversed(range(len(self._engines))):
+                _, args, communicator, engine = self._engines[i]
+                if args == cmdargs and communicator is comm:
+                    del self._engines[i]
+                    return engine
+        return PyLammps(cmdargs=list(cmdargs) or None, comm=comm)
+
+    def release(
+        self, engine: PyLammps, cmdargs: Iterable[str] = (), comm=None
+    ):
+        """Resets an engine and keeps it for later.
+
+        Args:
+            engine: engine no longer in use.
+            cmdargs: command-line arguments the engine was started with.
+            comm: MPI communicator of the engine.
+        """
+        engine.clear()
+        # PyLammps keeps the output of every run.
+        engine.runs.clear()
+        with self._lock:
+            now = monotonic()
+            self._engines.append((now, tuple(cmdargs), comm, engine))
+            self._evict(now)
+
+    def clear(self):
+        """Closes all the idle engines."""
+        with self._lock:
+            engines, self._engines = self._engines, []
+        for *_, engine in engines:
+            engine.close()
+
+    def _evict(self, now: float):
+        """Closes the engines idle for too long or that do not fit.
+
+        Must be called while holding the lock.
+
+        Args:
+            now: current time, as given by `time.monotonic`.
+        """
+        kept = [
+            item
+            for item in self._engines
+            if self.max_idle is None or now - item[0] <= self.max_idle
+        ]
+        kept = kept[max(len(kept) - self.max_size, 0) :]
+        for item in self._engines:
+            if not any(item is other for other in kept):
+                item[-1].close()
+        self._engines = kept
@@ -0,0 +1,97 @@
+"""State of a LAMMPS engine between two chunks of a run."""
+
+from typing import TYPE_CHECKING, Iterable, Optional, Union
+
+import numpy as np
+from simphony_osp.ontology import OntologyIndividual
+from simphony_osp.utils.datatypes import Identifier
+
+from simphony_osp_simlammps.views import AtomViews
+
+if TYPE_CHECKING:
+    from simphony_osp_simlammps.wrapper import SimLAMMPS
+
+
+class Snapshot:
+    """State of the engine between two chunks of a run.
+
+    Values are read from the engine only when requested. A snapshot is
+    only valid until the callback that received it returns.
+    """
+
+    step: int
+    """Current timestep of the engine."""
+
+    steps_done: int
+    """Steps already run since the run started."""
+
+    steps: int
+    """Total steps of the run."""
+
+    def __init__(
+        self, wrapper: "SimLAMMPS", step: int, steps_done: int, steps: int
+    ):
+        """Initialize the snapshot.
+
+        Args:
+            wrapper: the wrapper running the simulation.
+            step: current timestep of the engine.
+            steps_done: steps already run since the run started.
+            steps: total steps of the run.
+        """
+        self._wrapper = wrapper
+        self.step = step
+        self.steps_done = steps_done
+        self.steps = steps
+
+    @property
+    def identifiers(self) -> np.ndarray:
+        """Identifiers of the atoms on the engine."""
+        mapper = self._wrapper._atom_mapper
+        return mapper.get_many(np.sort(mapper.ids()))
+
+    def get(
+        self,
+        quantity: str,
+        atoms: Optional[
+            Iterable[Union[OntologyIndividual, Identifier]]
+        ] = None,
+    ) -> np.ndarray:
+        """Gets the values of a per-atom quantity.
+
+        Args:
+            quantity: one of the quantities in `SimLAMMPS.QUANTITIES`.
+            atoms: atoms (or their identifiers) to get the values for. All
+                the atoms, in the order of `identifiers`, when not
+                specified.
+
+        Returns:
+            Array with one row per atom.
+        """
+        _, name = self._wrapper.QUANTITIES[quantity]
+        mapper = self._wrapper._atom_mapper
+        if atoms is None:
+            ids = np.sort(mapper.ids())
+        else:
+            ids = mapper.get_many(
+                atom.identifier
+                if isinstance(atom, OntologyIndividual)
+                else atom
+                for atom in atoms
+            )
+        return self._wrapper._gather_atoms(name, ids)
+
+    def views(self) -> AtomViews:
+        """Gets read-only views of the per-atom arrays of the engine.
+
+        The views must not be used after the callback returns.
+        """
+        return self._wrapper._atom_views()
+
+    def thermo(self, keyword: str) -> float:
+        """Gets the current value of a thermodynamic keyword (e.g. `temp`).
+
+        Args:
+            keyword: thermodynamic keyword, as in LAMMPS' `thermo_style`.
+        """
+        return self._wrapper._engine.lmp.get_thermo(keyword)
@@ -1,13 +1,48 @@
 """Utility function and classes for the LAMMPS wrapper."""
 
-from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import gzip
+import mmap
+import re
+import struct
+from pathlib import Path
+from typing import BinaryIO, Iterator, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
 
 
 class LAMMPSInputScript:
-    """Class for parsing a LAMMPS input script."""
+    """Class for parsing a LAMMPS input script.
+
+    Parsing scans the file once, keeping the header and the location of
+    each section in the file. The contents of the sections are then read
+    from the file in chunks of a fixed number of lines, so that the memory
+    used does not grow with the size of the file.
+    """
 
     SECTIONS = ("Atoms", "Velocities", "Masses", "Bonds", "Pair Coeffs")
 
+    CHUNK_SIZE = 65536
+    """Default number of lines per chunk when reading a section."""
+
+    WINDOW_SIZE = 1 << 24
+    """Maximum number of bytes parsed at once by `load_section`."""
+
+    _NUMERIC_LINE = re.compile(rb"^[ \t]*[-+.0-9]", re.M)
+
+    ATOM_DTYPE = np.dtype(
+        [
+            ("id", np.int64),
+            ("type", np.int32),
+            ("x", np.float64),
+            ("y", np.float64),
+            ("z", np.float64),
+            ("vx", np.float64),
+            ("vy", np.float64),
+            ("vz", np.float64),
+        ]
+    )
+    """Data type of the arrays returned by `load_atoms`."""
+
     def __init__(self, filename: str):
         """Constructor.
 
@@ -15,56 +50,172 @@ class LAMMPSInputScript:
             filename: path to the input script.
         """
         self._filename = filename
-        self._content = None
+        self._header = None
+        self._sections = None
 
     def parse(self) -> None:
-        """Parses the file, loading the content."""
-        text = self._read_clean()
-        self._content = self._split_into_sections(text)
+        """Parses the file, locating the header and the sections."""
+        sections = {}
+        section, start = "Header", 0
+        with open(self._filename, "rb") as f, mmap.mmap(
+            f.fileno(), 0, access=mmap.ACCESS_READ
+        ) as data:
+            # Only lines starting with a letter can be section titles.
+            for match in re.finditer(rb"^[ \t]*[A-Za-z].*$", data, re.M):
+                line = self._clean(match.group())
+                if line.endswith(self.SECTIONS):
+                    sections[section] = (start, match.start())
+                    section, start = line, match.end()
+            sections[section] = (start, len(data))
+            header_start, header_end = sections["Header"]
+            header = data[header_start:header_end].splitlines()
+        self._header = [line for line in map(self._clean, header) if line]
+        self._sections = sections
 
-    def _read_clean(self) -> Iterable[str]:
-        """Reads the file, ignoring comments.
+    def iter_section(
+        self, section: str, chunk_size: Optional[int] = None
+    ) -> Iterator[np.ndarray]:
+        """Iterator for the numeric values of a section, in chunks.
+
+        Args:
+            section: name of the section (e.g. `Atoms`).
+            chunk_size: maximum number of lines per chunk. Defaults to
+                `CHUNK_SIZE`.
 
         Returns:
-            Loaded text as a list of lines.
+            An iterator of arrays with one row per line of the section and
+            one column per value in the lines.
         """
-        content = []
-        with open(self._filename) as f:
-            for line in f.readlines():
-                line = line.partition("#")[0].strip()
+        chunk_size = chunk_size or self.CHUNK_SIZE
+        start, end = self._sections[section]
+        with open(self._filename, "rb") as f:
+            f.seek(start)
+            lines = []
+            while start < end:
+                raw_line = f.readline()
+                start += len(raw_line)
+                line = self._clean(raw_line)
                 if line:
-                    content.append(line)
-        return content
+                    lines.append(line.split())
+                if len(lines) == chunk_size:
+                    yield np.array(lines, dtype=float)
+                    lines = []
+            if lines:
+                yield np.array(lines, dtype=float)
+
+    def atom_information_generator(self) -> Iterator[Tuple[float, float]]:
+        """Iterator for the positions and velocities of the atoms.
 
-    def _split_into_sections(self, lines: Iterable) -> Dict[str, List[str]]:
-        """Splits the given text into the supported sections.
+        Returns:
+            An iterator of the position and velocity values.
+
+        Raises:
+            ValueError: when the `Velocities` section does not have as many
+                lines as the `Atoms` section.
+        """
+        velocities = self.iter_section("Velocities")
+        for atoms in self.iter_section("Atoms"):
+            chunk = next(velocities, None)
+            if chunk is None or len(chunk) != len(atoms):
+                break
+            yield from zip(atoms[:, 2:5].tolist(), chunk[:, 1:4].tolist())
+        else:
+            if next(velocities, None) is None:
+                return
+        raise ValueError(
+            "The Velocities section does not have one line per atom in "
+            f"{self._filename}."
+        )
+
+    def load_section(self, section: str) -> np.ndarray:
+        """Loads all the numeric values of a section at once.
+
+        The file is memory-mapped and the section is parsed in windows of
+        at most `WINDOW_SIZE` bytes, cut at line boundaries, so that only
+        one window is copied out of the map at a time.
 
         Args:
-            lines: list with the lines.
+            section: name of the section (e.g. `Atoms`).
+
+        Returns:
+            Array with one row per line of the section and one column per
+            value in the lines.
+
+        Raises:
+            ValueError: when the section is not one of `SECTIONS` or is not
+                in the file, or when one of its lines cannot be parsed.
         """
-        output = {}
-        section = "Header"
-        output[section] = []
-        for line in lines:
-            if line.endswith(self.SECTIONS):
-                section = line
-                output[section] = []
-            else:
-                output[section].append(line)
-        return output
+        if section not in self._sections:
+            raise ValueError(
+                f"Unsupported or missing section {section} in "
+                f"{self._filename}, the supported sections are "
+                f"{', '.join(self.SECTIONS)}."
+            )
+        start, end = self._sections[section]
+        chunks = []
+        with open(self._filename, "rb") as f, mmap.mmap(
+            f.fileno(), 0, access=mmap.ACCESS_READ
+        ) as data:
+            while start < end:
+                stop = end
+                if start + self.WINDOW_SIZE < end:
+                    stop = data.rfind(b"\n", start, start + self.WINDOW_SIZE)
+                    stop = stop + 1 if stop >= start else end
+                # Windows without a numeric line would only yield a warning.
+                if self._NUMERIC_LINE.search(data, start, stop):
+                    window = data[start:stop].splitlines()
+                    chunks.append(np.loadtxt(window, comments="#", ndmin=2))
+                start = stop
+        if not chunks:
+            return np.empty((0, 0))
+        return np.concatenate(chunks)
 
-    def atom_information_generator(self) -> Iterator[Tuple[float, float]]:
-        """Iterator for the positions and velocities of the atoms.
+    def load_atoms(self) -> np.ndarray:
+        """Loads the atoms and their velocities at once.
+
+        Velocities are matched with the atoms by their atom id. Atoms
+        without a velocity get a zero velocity.
+
+        Raises:
+            ValueError: when the velocities do not match the atoms, or when
+                a line of the `Atoms` or `Velocities` sections cannot be
+                parsed (see `load_section`).
 
         Returns:
-            An iterator of the position and velocity values.
+            Structured array with the fields of `ATOM_DTYPE`, one element
+            per atom, in the order of the `Atoms` section.
         """
-        positions = self._content["Atoms"]
-        velocities = self._content["Velocities"]
-        for idx, line in enumerate(positions):
-            pos = list(map(float, line.split()[2:5]))
-            vel = list(map(float, velocities[idx].split()[1:]))
-            yield pos, vel
+        if "Atoms" not in self._sections:
+            return np.zeros(0, dtype=self.ATOM_DTYPE)
+        atoms = self.load_section("Atoms")
+        output = np.zeros(len(atoms), dtype=self.ATOM_DTYPE)
+        if not len(output):
+            return output
+        output["id"] = atoms[:, 0]
+        output["type"] = atoms[:, 1]
+        output["x"], output["y"], output["z"] = atoms[:, 2:5].T
+
+        if "Velocities" in self._sections:
+            velocities = self.load_section("Velocities")
+            ids = velocities[:, 0].astype(np.int64)
+            order = np.argsort(ids)
+            index = order[
+                np.searchsorted(ids, output["id"], sorter=order).clip(
+                    0, len(ids) - 1
+                )
+            ]
+            if len(ids) != len(output) or np.any(ids[index] != output["id"]):
+                raise ValueError(
+                    "The velocities do not match the atoms in "
+                    f"{self._filename}."
+                )
+            output["vx"], output["vy"], output["vz"] = velocities[index, 1:4].T
+        return output
+
+    @staticmethod
+    def _clean(raw_line: bytes) -> str:
+        """Decodes a line of the file, removing comments and whitespace."""
+        return raw_line.decode().partition("#")[0].strip()
 
     def box_coordinates(
         self,
@@ -79,7 +230,7 @@ class LAMMPSInputScript:
             The coordinates (x, y, z) of the box
         """
         x, y, z = None, None, None
-        for line in self._content["Header"]:
+        for line in self._header:
             if line.endswith("xlo xhi"):
                 words = line.split()
                 val = float(words[1]) - float(words[0])
@@ -93,3 +244,250 @@ class LAMMPSInputScript:
                 val = float(words[1]) - float(words[0])
                 z = (0, 0, val)
         return x, y, z
+
+
+class TrajectoryFrame(NamedTuple):
+    """Per-atom quantities of the atoms at one timestep of a trajectory."""
+
+    step: int
+    """Timestep of the frame."""
+
+    box: np.ndarray
+    """Lower and upper bounds of the box along each axis (3 x 2)."""
+
+    atoms: np.ndarray
+    """Structured array with one float field per column, one element per
+    atom."""
+
+
+class LAMMPSTrajectory:
+    """Class for reading the trajectories written by LAMMPS.
+
+    Reads the frames of `custom` dumps, either binary or compressed with
+    gzip. Binary files are memory-mapped: the atoms of each frame are
+    read-only views of the file, and only the pages that are accessed are
+    read from disk. Compressed files are decompressed one frame at a
+    time. A frame that LAMMPS has not finished writing is skipped.
+    """
+
+    MAGIC = b"DUMPCUSTOM"
+    """Magic string at the start of each frame of a binary dump."""
+
+    def __init__(self, file: Union[str, Path, BinaryIO]):
+        """Constructor.
+
+        Args:
+            file: path to the dump, or a file object opened in binary
+                mode (for example, the handle of a `Trajectory`). File
+                objects are not closed.
+        """
+        self._file = file
+
+    def __iter__(self) -> Iterator[TrajectoryFrame]:
+        """Iterator for the frames of the trajectory."""
+        file = self._file
+        if isinstance(file, (str, Path)):
+            file = open(file, "rb")
+        try:
+            compressed = file.read(2) == b"\x1f\x8b"
+            file.seek(0)
+            if compressed:
+                yield from self._text_frames(file)
+            else:
+                # The frames keep the memory map open while they are used.
+                yield from self._binary_frames(self._map(file))
+        finally:
+            if file is not self._file:
+                file.close()
+
+    @staticmethod
+    def _map(file: BinaryIO) -> Union[mmap.mmap, bytes]:
+        """Memory-maps a file (empty files cannot be mapped)."""
+        if not file.seek(0, 2):
+            return b""
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _binary_frames(
+        self, data: Union[mmap.mmap, bytes]
+    ) -> Iterator[TrajectoryFrame]:
+        """Iterator for the frames of a binary dump.
+
+        Args:
+            data: contents of the dump.
+
+        Raises:
+            ValueError: when the file is not a binary `custom` dump.
+        """
+        offset = 0
+        while offset < len(data):
+            try:
+                frame, offset = self._binary_frame(data, offset)
+            except (struct.error, EOFError):
+                # LAMMPS is still writing the frame.
+                return
+            yield frame
+
+    def _binary_frame(
+        self, data: Union[mmap.mmap, bytes], offset: int
+    ) -> Tuple[TrajectoryFrame, int]:
+        """Reads the frame of a binary dump starting at an offset.
+
+        Args:
+            data: contents of the dump.
+            offset: position of the frame in the contents.
+
+        Raises:
+            ValueError: when the file is not a binary `custom` dump.
+            EOFError: when the frame is incomplete.
+
+        Returns:
+            The frame and the position of the next frame.
+        """
+        error = f"{self._file} is not a binary LAMMPS custom dump."
+
+        def read(fmt: str):
+            nonlocal offset
+            values = struct.unpack_from("=" + fmt, data, offset)
+            offset += struct.calcsize("=" + fmt)
+            return values if len(values) > 1 else values[0]
+
+        magic = self.MAGIC
+        if read("q") != -len(magic):
+            raise ValueError(error)
+        if data[offset : offset + len(magic)] != magic:
+            raise ValueError(error)
+        offset += len(magic)
+        endian, _ = read("2i")
+        if endian != 1:
+            raise ValueError(error)
+        step, count = read("2q")
+        triclinic = read("i")
+        offset += struct.calcsize("=6i")  # Boundary flags.
+        box = np.array(read("6d")).reshape(3, 2)
+        if triclinic:
+            offset += struct.calcsize("=3d")  # Tilt factors.
+        size_one = read("i")
+        length = read("i")
+        offset += length  # Units.
+        if read("b"):
+            offset += struct.calcsize("=d")  # Time.
+        length = read("i")
+        columns = data[offset : offset + length].decode()
+        offset += length
+        dtype = np.dtype([(name, np.float64) for name in columns.split()])
+        if dtype.itemsize != size_one * 8:
+            raise ValueError(error)
+
+        chunks = [np.empty(0, dtype=dtype)]
+        for _ in range(read("i")):
+            length = read("i")
+            if offset + length * 8 > len(data):
+                raise EOFError
+            chunks.append(
+                np.frombuffer(
+                    data, dtype=dtype, count=length // size_one, offset=offset
+                )
+            )
+            offset += length * 8
+        atoms = chunks[-1] if len(chunks) == 2 else np.concatenate(chunks)
+        if len(atoms) != count:
+            raise EOFError
+        return TrajectoryFrame(step, box, atoms), offset
+
+    @staticmethod
+    def _text_frames(file: BinaryIO) -> Iterator[TrajectoryFrame]:
+        """Iterator for the frames of a dump compressed with gzip.
+
+        Args:
+            file: the compressed dump.
+        """
+        with gzip.GzipFile(fileobj=file) as stream:
+            try:
+                while stream.readline().startswith(b"ITEM: TIMESTEP"):
+                    step = int(stream.readline())
+                    stream.readline()
+                    count = int(stream.readline())
+                    stream.readline()
+                    box = np.loadtxt(
+                        [stream.readline() for _ in range(3)],
+                        usecols=(0, 1),
+                        ndmin=2,
+                    )
+                    columns = stream.readline().decode().split()[2:]
+                    lines = [stream.readline() for _ in range(count)]
+                    if lines and not lines[-1].endswith(b"\n"):
+                        return
+                    values = np.zeros((count, len(columns)))
+                    if count:
+                        values[:] = np.loadtxt(lines, ndmin=2)
+                    dtype = np.dtype([(name, np.float64) for name in columns])
+                    yield TrajectoryFrame(
+                        step, box, values.view(dtype).ravel()
+                    )
+            except (EOFError, ValueError):
+                # LAMMPS is still writing the file.
+                return
+
+
+class RingBuffer:
+    """Time series that keeps only its most recent samples.
+
+    The samples are stored in preallocated arrays that are overwritten
+    cyclically, so that recording a sample never allocates memory.
+    """
+
+    size: int
+    """Maximum number of samples kept."""
+
+    def __init__(self, size: int):
+        """Constructor.
+
+        Args:
+            size: maximum number of samples kept.
+
+        Raises:
+            ValueError: when the size is not positive.
+        """
+        if size <= 0:
+            raise ValueError("The size of a ring buffer must be positive.")
+        self.size = size
+        self._steps = np.zeros(size, dtype=np.int64)
+        self._values = np.zeros(size, dtype=np.float64)
+        self._count = 0
+
+    def __len__(self) -> int:
+        """Number of samples kept."""
+        return min(self._count, self.size)
+
+    def append(self, step: int, value: float):
+        """Records a sample, discarding the oldest one if the buffer is full.
+
+        Args:
+            step: timestep of the sample.
+            value: value of the sample.
+        """
+        index = self._count % self.size
+        self._steps[index] = step
+        self._values[index] = value
+        self._count += 1
+
+    def clear(self):
+        """Discards all the samples."""
+        self._count = 0
+
+    def series(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the samples kept, oldest first.
+
+        Returns:
+            New arrays with the timesteps and values of the samples.
+        """
+        if self._count <= self.size:
+            return (
+                self._steps[: self._count].copy(),
+                self._values[: self._count].copy(),
+            )
+        index = self._count % self.size
+        return (
+            np.roll(self._steps, -index),
+            np.roll(self._values, -index),
+        )
@@ -0,0 +1,30 @@
+"""Read-only views of the per-atom arrays of a LAMMPS engine."""
+
+from typing import NamedTuple
+
+import numpy as np
+
+
+class AtomViews(NamedTuple):
+    """Read-only views of the per-atom arrays of the engine.
+
+    Row `i` of each array belongs to the atom `identifiers[i]`. Only the
+    atoms owned by the MPI rank are included, in the order of the engine.
+    The views are only valid until the engine runs again or the session
+    is committed: LAMMPS may then sort, move or reallocate the atoms.
+    """
+
+    identifiers: np.ndarray
+    """Identifiers of the atoms."""
+
+    x: np.ndarray
+    """Positions of the atoms (N x 3)."""
+
+    v: np.ndarray
+    """Velocities of the atoms (N x 3)."""
+
+    f: np.ndarray
+    """Forces on the atoms (N x 3)."""
+
+    type: np.ndarray
+    """LAMMPS atom types of the atoms (their materials)."""
@@ -1,17 +1,108 @@
 """LAMMPS wrapper implementation."""
 
+import json
+import shlex
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import product
 from pathlib import Path
 from tempfile import TemporaryDirectory
-from typing import BinaryIO, Dict, List, Optional, Tuple
+from threading import Lock
+from time import perf_counter
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+from uuid import NAMESPACE_URL, uuid4, uuid5
 
 import numpy as np
-from lammps import Atom, PyLammps
+from lammps import PyLammps
+from rdflib import RDF, Literal, URIRef
 from simphony_osp.development import Wrapper, get_hash
 from simphony_osp.namespaces import owl, simlammps
-from simphony_osp.ontology import OntologyIndividual
+from simphony_osp.ontology import OntologyClass, OntologyIndividual
 from simphony_osp.session import Session
+from simphony_osp.utils.datatypes import (
+    ENTITY_IRI_PREFIX,
+    Identifier,
+    Pattern,
+    Triple,
+    Vector,
+)
 
 from simphony_osp_simlammps.mapper import Mapper
+from simphony_osp_simlammps.pool import EnginePool
+from simphony_osp_simlammps.snapshot import Snapshot
+from simphony_osp_simlammps.utils import RingBuffer
+from simphony_osp_simlammps.views import AtomViews
+
+
+class _RunFuture(Future):
+    """Future of a run in the background (see `compute_async`).
+
+    The worker thread only runs the engine. The session is updated by the
+    first call to `result`, on the thread that makes it, as session
+    contexts are shared by all threads.
+    """
+
+    def __init__(self, wrapper: "SimLAMMPS", session: Session):
+        """Initialize the future.
+
+        Args:
+            wrapper: the wrapper running the simulation.
+            session: the session to update once the run finishes.
+        """
+        super().__init__()
+        self._wrapper = wrapper
+        self._session = session
+        self._collected = False
+        self._collect_lock = Lock()
+
+    def result(self, timeout: Optional[float] = None) -> None:
+        """Waits for the run to finish and updates the session.
+
+        Args:
+            timeout: seconds to wait. Forever when not specified.
+
+        Raises:
+            TimeoutError: when the run did not finish in time.
+        """
+        try:
+            return super().result(timeout)
+        finally:
+            if self.done():
+                self._collect()
+
+    def cancel(self) -> bool:
+        """Cancels the run if it did not start yet."""
+        cancelled = super().cancel()
+        if cancelled:
+            self._collect()
+        return cancelled
+
+    def _collect(self) -> None:
+        """Updates the session once, unless the run failed."""
+        with self._collect_lock:
+            if self._collected:
+                return
+            self._collected = True
+            wrapper = self._wrapper
+            try:
+                if not self.cancelled() and self.exception() is None:
+                    wrapper._writing_back = True
+                    self._session.compute(run=False)
+            finally:
+                wrapper._writing_back = False
+                wrapper._running = False
 
 
 class SimLAMMPS(Wrapper):
@@ -20,7 +111,142 @@ class SimLAMMPS(Wrapper):
     _engine: Optional[PyLammps] = None
     _atom_mapper: Optional[Mapper] = None
     _material_mapper: Optional[Mapper] = None
-    _videos: Dict[str, TemporaryDirectory]
+    _output_dir: Optional[TemporaryDirectory] = None
+    _files: Dict[str, Path]
+    _observables: Dict[Identifier, Tuple[str, RingBuffer]]
+    _history: int
+    _sync: Tuple[str, ...]
+    _sync_atoms: Optional[Set[Identifier]]
+    _lazy: bool = False
+    _strict: bool
+    _comm: Optional[object]
+    _threads: Optional[int]
+    _accelerate: bool
+    _suffixes: Tuple[str, ...] = ()
+    _neighbor: Dict[str, Any]
+    _pool: Optional[EnginePool]
+    _checkpoint: Optional[Path]
+    _data_file: Optional[Path]
+    _pending: np.ndarray
+    _cmdargs: List[str]
+    _stale: bool = False
+    _live: Dict[URIRef, Optional[Literal]]
+    _parts: Dict[OntologyClass, Tuple[np.ndarray, List[URIRef]]]
+    _forces: Dict[int, Optional[np.ndarray]]
+    _forces_fix: bool
+    _dispatch: Dict[str, Dict[FrozenSet[OntologyClass], Optional[int]]]
+    _changed: Set[OntologyIndividual]
+    _executor: Optional[ThreadPoolExecutor] = None
+    _running: bool = False
+    _writing_back: bool = False
+
+    QUANTITIES = {
+        "position": (simlammps.Position, "x"),
+        "velocity": (simlammps.Velocity, "v"),
+        "force": (simlammps.Force, "f"),
+    }
+    """Per-atom quantities that can be written back to the session.
+
+    Maps the name of each quantity to its ontology class and to the name
+    of the per-atom quantity in LAMMPS.
+    """
+
+    FORCE_PROPERTIES = ("d_fx", "d_fy", "d_fz")
+    """Per-atom properties holding the forces imposed on the atoms."""
+
+    FORCED_PROPERTY = "i_forced"
+    """Per-atom property flagging the atoms with an imposed force."""
+
+    OBSERVABLES = {
+        simlammps.Temperature: "temp",
+        simlammps.Pressure: "press",
+        simlammps.PotentialEnergy: "pe",
+        simlammps.KineticEnergy: "ke",
+        simlammps.TotalEnergy: "etotal",
+    }
+    """Thermodynamic keywords of LAMMPS for each class of observable."""
+
+    LATTICES = {
+        simlammps.SimpleCubic: ("sc", 1),
+        simlammps.BodyCenteredCubic: ("bcc", 2),
+        simlammps.FaceCenteredCubic: ("fcc", 4),
+        simlammps.HexagonalClosePacked: ("hcp", 2**0.5),
+        simlammps.Diamond: ("diamond", 8),
+    }
+    """LAMMPS lattice style for each class of lattice.
+
+    Also gives the number of sites per cubed lattice constant, to convert
+    lattice constants into the reduced densities that LAMMPS expects with
+    `lj` units.
+    """
+
+    TRAJECTORY_COLUMNS = "id type x y z"
+    """Default per-atom quantities of the trajectories."""
+
+    NEIGHBOR = {
+        "skin": 0.3,
+        "style": "bin",
+        "every": 1,
+        "delay": 5,
+        "check": True,
+        "page": None,
+        "one": None,
+    }
+    """Default neighbor list settings.
+
+    `skin` and `style` are the arguments of the `neighbor` command of
+    LAMMPS, the rest are keywords of `neigh_modify`. The LAMMPS defaults
+    are kept for the settings that are `None`.
+    """
+
+    _HANDLERS = {
+        "remove": (
+            (simlammps.Observable, "_remove_observables"),
+            (simlammps.BoundaryCondition, "_update_parent_boxes"),
+            (simlammps.Atom, "_remove_atoms"),
+            (simlammps.Position, "_reset_positions"),
+            (simlammps.Velocity, "_reset_velocities"),
+            (simlammps.Force, "_unset_forces"),
+        ),
+        "add": (
+            (simlammps.Thermostat, "_define_fixes"),
+            (simlammps.Video, "_add_videos"),
+            (simlammps.Trajectory, "_add_trajectories"),
+            (simlammps.Observable, "_add_observables"),
+            (simlammps.SimulationBox, "_add_simulation_boxes"),
+            (simlammps.Face, "_update_parent_boxes"),
+            (simlammps.BoundaryCondition, "_update_parent_boxes"),
+            (simlammps.Material, "_add_materials"),
+            (simlammps.LennardJones612, "_add_pair_styles"),
+            (simlammps.Lattice, "_add_lattices"),
+            (simlammps.Atom, "_add_atoms"),
+            (simlammps.Position, "_set_positions"),
+            (simlammps.Velocity, "_set_velocities"),
+            (simlammps.Force, "_set_forces"),
+        ),
+        "update": (
+            (simlammps.Thermostat, "_define_fixes"),
+            (simlammps.Video, "_update_videos"),
+            (simlammps.Trajectory, "_update_videos"),
+            (simlammps.SimulationBox, "_update_simulation_boxes"),
+            (simlammps.Face, "_update_parent_boxes"),
+            (simlammps.BoundaryCondition, "_update_parent_boxes"),
+            (simlammps.Material, "_add_materials"),
+            (simlammps.LennardJones612, "_update_pair_styles"),
+            (simlammps.Lattice, "_update_lattices"),
+            (simlammps.Atom, "_update_atoms"),
+            (simlammps.Position, "_set_positions"),
+            (simlammps.Velocity, "_set_velocities"),
+            (simlammps.Force, "_set_forces"),
+        ),
+    }
+    """Dispatch tables for the individuals changed by the user.
+
+    For each operation, maps classes of individuals to the name of the
+    method that handles them on commit. Each method receives all the
+    changed individuals of its class at once, and the methods are run in
+    the order of the table.
+    """
 
     # Interface
     # ↓ ----- ↓
@@ -28,11 +254,103 @@ class SimLAMMPS(Wrapper):
     entity_tracking: bool = True
     """Gives access to lists of added, updated and deleted entities."""
 
+    def __init__(
+        self,
+        sync: Iterable[str] = tuple(QUANTITIES),
+        lazy: bool = False,
+        strict: bool = False,
+        comm=None,
+        threads: Optional[int] = None,
+        accelerate: bool = True,
+        neighbor: Optional[Mapping[str, Any]] = None,
+        pool: Optional[EnginePool] = None,
+        checkpoint: Optional[Union[str, Path]] = None,
+        data_file: Optional[Union[str, Path]] = None,
+        history: int = 1000,
+        **kwargs,
+    ):
+        """Initialize the wrapper.
+
+        Args:
+            sync: per-atom quantities (see `QUANTITIES`) to write back to
+                the session after each run. Use `subscribe` to change them
+                later or to restrict them to some atoms.
+            lazy: instead of writing the subscribed quantities back to the
+                session after each run, fetch each value from the engine
+                the first time it is read after the run.
+            strict: check the consistency of all the atoms, positions,
+                velocities and forces on each commit, instead of only the
+                changed ones and their neighbours.
+            comm: MPI communicator (an `mpi4py` communicator) to run
+                LAMMPS on. All the ranks of `MPI_COMM_WORLD` are used when
+                not specified.
+            threads: number of OpenMP threads per MPI rank. When given,
+                the OPENMP variants of the styles are preferred.
+            accelerate: use the fastest accelerated variant of the styles
+                that the installed LAMMPS offers (see `_accelerated`).
+                Ignored when the configuration string sets a suffix.
+            neighbor: neighbor list settings that differ from the
+                defaults (see `NEIGHBOR`). Use `tune_neighbor` to find
+                good values for a system.
+            pool: pool to take the engine from when the session opens,
+                and to return it to when the session closes. A new
+                engine is started and then discarded when not specified.
+            checkpoint: directory written by `save_checkpoint` to resume
+                the simulation from.
+            data_file: LAMMPS data file (atomic style) to start the
+                simulation from. It is read by LAMMPS itself, and only the
+                box and the materials are added to the session. The atoms
+                are added to the session when requested with
+                `materialize_atoms`. The force field coefficients in the
+                file are ignored, define them in the session.
+            history: number of samples of each observable to keep (see
+                `time_series`).
+            kwargs: further keyword arguments for the wrapper.
+
+        Raises:
+            ValueError: when a neighbor list setting is not supported, or
+                when both a checkpoint and a data file are given.
+        """
+        super().__init__(**kwargs)
+        self._subscribe(sync)
+        self._lazy = lazy
+        self._strict = strict
+        self._comm = comm
+        self._threads = threads
+        self._accelerate = accelerate
+        neighbor = dict(neighbor or ())
+        for key in neighbor:
+            if key not in self.NEIGHBOR:
+                raise ValueError(
+                    f"Unsupported neighbor list setting {key}, choose among "
+                    f"{', '.join(self.NEIGHBOR)}."
+                )
+        self._neighbor = {**self.NEIGHBOR, **neighbor}
+        self._pool = pool
+        if checkpoint is not None and data_file is not None:
+            raise ValueError(
+                "A simulation cannot start from both a checkpoint and a "
+                "data file."
+            )
+        self._checkpoint = None if checkpoint is None else Path(checkpoint)
+        self._data_file = None if data_file is None else Path(data_file)
+        self._history = history
+        self._dispatch = dict()
+
     def open(self, configuration: str, create: bool = False) -> None:
         """Prepare the wrapper for a new simulation.
 
+        To split the atoms across several MPI ranks, launch the script
+        with `mpirun` (every rank runs the whole script). Every rank must
+        build the same session, with the same identifiers (for example,
+        loading it from the same file). Commits, runs, lazy reads and
+        snapshots are collective operations, so all the ranks must make
+        them in the same order. `compute_async` is not supported.
+
         Args:
-            configuration: Ignored.
+            configuration: command-line arguments for LAMMPS, for example
+                `-sf omp -pk omp 4` to use the OPENMP accelerated styles
+                with four threads per rank.
             create: Ignored.
         """
         if any(
@@ -44,137 +362,718 @@ class SimLAMMPS(Wrapper):
                 "first."
             )
 
-        self._videos = dict()
-        self._engine = PyLammps()
+        self._output_dir = TemporaryDirectory()
+        self._files = dict()
+        self._observables = dict()
+        self._live = dict()
+        self._parts = dict()
+        self._forces = dict()
+        self._forces_fix = False
+        self._pending = np.empty(0, dtype=np.int64)
+        self._cmdargs = shlex.split(configuration or "")
+        if self._pool is not None:
+            self._engine = self._pool.acquire(self._cmdargs, self._comm)
+        else:
+            self._engine = PyLammps(
+                cmdargs=self._cmdargs or None, comm=self._comm
+            )
+        self._suffixes = self._find_suffixes(self._cmdargs)
         self._atom_mapper = Mapper()
         self._material_mapper = Mapper()
         self._add_settings()
 
     def close(self) -> None:
-        """Destroy the existing LAMMPS engine instance."""
+        """Destroy the existing LAMMPS engine instance.
+
+        When the session has an engine pool, the engine is reset and
+        returned to the pool instead.
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        if self._pool is not None and self._engine is not None:
+            self._pool.release(self._engine, self._cmdargs, self._comm)
         self._engine = None
         self._atom_mapper = None
         self._material_mapper = None
-        if hasattr(self, "_videos"):
-            for video in self._videos.values():
-                video.cleanup()
-        self._videos = dict()
+        self._stale = False
+        if self._output_dir is not None:
+            self._output_dir.cleanup()
+        self._output_dir = None
+        self._files = dict()
 
     def populate(self) -> None:
-        """Not required, as there is no pre-existing data to load."""
+        """Start from the checkpoint or data file given, if any."""
+        if self._checkpoint is not None:
+            self._load_checkpoint(self._checkpoint)
+        elif self._data_file is not None:
+            self._read_data(self._data_file)
+
+    def _load_checkpoint(self, path: Path) -> None:
+        """Resumes the simulation from a checkpoint.
+
+        The session and the ids of the atoms and materials are loaded as
+        they were saved, and the engine reads its restart file. Nothing
+        needs to be committed again: only the fixes, neighbor settings,
+        videos, trajectories and observables, which LAMMPS does not save,
+        are set again on the engine. The trajectories start again in new
+        files, and the time series of the observables start empty.
+
+        Args:
+            path: directory written by `save_checkpoint`.
+        """
+        with open(path / "state.json") as file:
+            state = json.load(file)
+        self.base.parse(path / "session.nt", format="nt")
+        self._atom_mapper = Mapper.load(path / "atoms.npz")
+        self._material_mapper = Mapper.load(path / "materials.npz")
+        self._pending = np.load(path / "pending.npy")
+        self._engine.read_restart(path / "engine.restart")
+        self._set_neighbor()
+
+        if self.session.get(oclass=simlammps.SimulationBox):
+            self._define_fix(None)
+        self._add_videos(list(self.session.get(oclass=simlammps.Video)))
+        self._add_trajectories(
+            list(self.session.get(oclass=simlammps.Trajectory))
+        )
+        self._add_observables(
+            list(self.session.get(oclass=simlammps.Observable))
+        )
+        # The forces written back to the session are not all imposed, the
+        # restart file tells which are.
+        if state["forces"]:
+            self._define_forces_fix()
+            self._engine.group("forced", "variable", "forced")
+
+        if state["stale"]:
+            if self._lazy:
+                self._stale = True
+            else:
+                self._update_atoms_from_backend()
+
+    def _read_data(self, path: Path) -> None:
+        """Starts the simulation from a LAMMPS data file.
+
+        The engine reads the file with `read_data`. The simulation box is
+        moved to the origin, together with the atoms, and added to the
+        session with one material per atom type. The atoms are only
+        registered on the atom mapper, waiting to be materialized (see
+        `_materialize`).
+
+        The identifiers are derived from the path of the file, so that
+        every MPI rank gets the same ones.
+
+        Args:
+            path: path of the data file.
+        """
+        path = path.resolve()
+        self._engine.read_data(path, "nocoeff")
+        lmp = self._engine.lmp
+        natoms = lmp.get_natoms()
+        if natoms:
+            tags = np.ctypeslib.as_array(lmp.gather_atoms_concat("id", 0, 1))
+            # The ids of the engine must be the ids of the mapper plus one.
+            if tags.max() != natoms:
+                self._engine.reset_atoms("id")
+
+        namespace = uuid5(NAMESPACE_URL, path.as_uri())
+
+        def identifier(name: str) -> URIRef:
+            """Identifier of an individual created from the file."""
+            return URIRef(ENTITY_IRI_PREFIX + str(uuid5(namespace, name)))
+
+        boxlo, boxhi, _, _, _, periodicity, _ = lmp.extract_box()
+        # Simulation boxes have their origin at zero, shift the atoms too.
+        if any(boxlo):
+            self._engine.change_box(
+                "all",
+                "x",
+                "final",
+                0,
+                boxhi[0] - boxlo[0],
+                "y",
+                "final",
+                0,
+                boxhi[1] - boxlo[1],
+                "z",
+                "final",
+                0,
+                boxhi[2] - boxlo[2],
+                "remap",
+                "units",
+                "box",
+            )
+        box = simlammps.SimulationBox(iri=identifier("box"))
+        for i, face_class in enumerate(
+            (simlammps.FaceX, simlammps.FaceY, simlammps.FaceZ)
+        ):
+            vector = [0, 0, 0]
+            vector[i] = boxhi[i] - boxlo[i]
+            face = face_class(iri=identifier(f"face {i}"), vector=vector)
+            if periodicity[i]:
+                face[simlammps.hasPart] += simlammps.Periodic(
+                    iri=identifier(f"periodic {i}")
+                )
+            box[simlammps.hasPart] += face
+        self._define_fix(None)
+
+        masses = lmp.extract_atom("mass")
+        # Atom types start at 1
+        for atom_type in range(1, lmp.extract_global("ntypes") + 1):
+            material = simlammps.Material(
+                iri=identifier(f"material {atom_type}")
+            )
+            material[simlammps.hasPart] += simlammps.Mass(
+                iri=identifier(f"mass {atom_type}"), value=masses[atom_type]
+            )
+            self._material_mapper.add(material.identifier)
+
+        # Lammps internal id = pylammps id + 1
+        self._atom_mapper.add_many(
+            identifier(f"atom {tag}") for tag in range(1, natoms + 1)
+        )
+        self._pending = np.arange(natoms, dtype=np.int64)
+
+    def _materialize(self, atoms: Union[int, np.ndarray]) -> List[Identifier]:
+        """Adds atoms that are only on the engine to the session.
+
+        These are the atoms read from a data file, added with `add_atoms`
+        or created by lattices. The atoms are added in the order of their
+        ids, with a position, a velocity (when it is not zero) and the
+        force imposed on them (if any). The triples are written to the
+        base graph directly, without going through a commit or a run.
+
+        Args:
+            atoms: maximum number of atoms to add, or the pylammps ids of
+                the atoms to add.
+
+        Returns:
+            The identifiers of the added atoms.
+        """
+        if isinstance(atoms, np.ndarray):
+            ids = np.intersect1d(atoms, self._pending)
+            self._pending = np.setdiff1d(self._pending, ids)
+        else:
+            ids, self._pending = self._pending[:atoms], self._pending[atoms:]
+        if not len(ids):
+            return []
+        lmp = self._engine.lmp
+        # Lammps internal id = pylammps id + 1
+        tags = (lmp.c_tagint * len(ids))(*(ids + 1).tolist())
+        types = np.ctypeslib.as_array(
+            lmp.gather_atoms_subset("type", 0, 1, len(ids), tags)
+        )
+        # Atom types start at 1
+        materials = self._material_mapper.get_many(types - 1)
+        identifiers = self._atom_mapper.get_many(ids)
+        graph = self.base
+        parts = [
+            ("position", simlammps.Position, self._gather_atoms("x", ids)),
+            ("velocity", simlammps.Velocity, self._gather_atoms("v", ids)),
+        ]
+        forced = np.zeros(len(ids), dtype=bool)
+        if self._forces_fix:
+            forced = np.ctypeslib.as_array(
+                lmp.gather_atoms_subset(
+                    self.FORCED_PROPERTY, 0, 1, len(ids), tags
+                )
+            ).astype(bool)
+            forces = np.column_stack(
+                [
+                    np.ctypeslib.as_array(
+                        lmp.gather_atoms_subset(name, 1, 1, len(ids), tags)
+                    )
+                    for name in self.FORCE_PROPERTIES
+                ]
+            )
+            parts.append(("force", simlammps.Force, forces))
+        for i, (atom, material) in enumerate(zip(identifiers, materials)):
+            graph.add((atom, RDF.type, simlammps.Atom.iri))
+            graph.add((atom, simlammps.hasPart.iri, material))
+            for name, oclass, values in parts:
+                if oclass is simlammps.Velocity and not values[i].any():
+                    continue
+                if oclass is simlammps.Force and not forced[i]:
+                    continue
+                part = URIRef(
+                    ENTITY_IRI_PREFIX
+                    + str(uuid5(NAMESPACE_URL, f"{atom}#{name}"))
+                )
+                graph.add((atom, simlammps.hasPart.iri, part))
+                graph.add((part, RDF.type, oclass.iri))
+                graph.add(
+                    (
+                        part,
+                        simlammps.vector.iri,
+                        Literal(Vector(values[i]), datatype=Vector.iri),
+                    )
+                )
+        graph.commit()
+        self._parts.clear()
+        return identifiers.tolist()
 
     def commit(self) -> None:
         """Update data structures on the engine to match the user's desires."""
+        if self._running and not self._writing_back:
+            raise RuntimeError(
+                "The engine is running in the background, wait for the "
+                "result of the run before committing."
+            )
+
+        # Sort the changed individuals by the handler for their class.
+        self._changed = self.added | self.updated
+        buckets = {
+            operation: self._bucket(operation, individuals)
+            for operation, individuals in (
+                ("remove", self.deleted),
+                ("add", self.added),
+                ("update", self.updated),
+            )
+        }
         # Perform a consistency check if the user changed something. Raises
         # an `AssertionError` if the consistency check fails. This prevents
         # to some extent the case in which the changes are only partially
         # committed.
-        if self.added | self.updated | self.deleted:
-            self._consistency_check()
+        if self._changed or self.deleted:
+            self._consistency_check(buckets)
 
         # Ensure that every material in the session is mapped to a LAMMPS
         # material.
-        for individual in self.session.get(oclass=simlammps.Material):
+        for individual in sorted(
+            self.session.get(oclass=simlammps.Material),
+            key=lambda x: x.identifier,
+        ):
             self._map_material(individual)
 
-        def key(
-            ontology_individual: OntologyIndividual,
-            order: Tuple,
-        ) -> int:
-            """Process ontology individuals in a certain order.
-
-            Serves as a key for ordering a list of ontology individuals to
-            be processed according to the given ordering. If the class of
-            the ontology individual is not specified in the ordering,
-            then it is processed before the individuals whose classes are
-            specified in the ordering.
-
-            Args:
-                ontology_individual: The ontology individual to provide a
-                    sorting key for.
-                order: The preferred ordering of ontology classes.
-            """
-            index = 0
-            for class_ in ontology_individual.superclasses:
-                index = max(
-                    index,
-                    order.index(class_) + 1 if class_ in order else 0,
-                )
-            return index
+        # Run the handlers in the order of the dispatch tables.
+        for operation in ("remove", "add", "update"):
+            for oclass, handler in self._HANDLERS[operation]:
+                if buckets[operation][oclass]:
+                    getattr(self, handler)(buckets[operation][oclass])
 
-        ordering = (
-            simlammps.Atom,
-            simlammps.Position,
-            simlammps.Velocity,
-            simlammps.Force,
-        )
-        for individual in sorted(self.deleted, key=lambda x: key(x, ordering)):
-            self._remove_by_type(individual)
-
-        ordering = (
-            simlammps.SimulationBox,
-            simlammps.Face,
-            simlammps.BoundaryCondition,
-            simlammps.Material,
-            simlammps.Mass,
-            simlammps.LennardJones612,
-            simlammps.Atom,
-            simlammps.Position,
-            simlammps.Velocity,
-            simlammps.Force,
-        )
-        for individual in sorted(self.added, key=lambda x: key(x, ordering)):
-            self._add_by_type(individual)
+        self._apply_forces()
 
-        # ordering = (...) does not change
-        for individual in sorted(self.updated, key=lambda x: key(x, ordering)):
-            self._update_by_type(individual)
+        # Engine values fetched in lazy mode may have been overwritten.
+        self._live.clear()
+        if self.added or self.deleted:
+            # Parts may have been connected to or disconnected from atoms.
+            self._parts.clear()
+
+    def compute(
+        self,
+        chunk_size: Optional[int] = None,
+        callback: Optional[Callable[[Snapshot], Optional[bool]]] = None,
+        run: bool = True,
+    ) -> None:
+        """Run the LAMMPS simulation.
 
-    def compute(self) -> None:
-        """Run the LAMMPS simulation."""
+        Args:
+            chunk_size: run the steps in chunks of this size, calling the
+                callback after each chunk. For the integrator, the chunks
+                are still a single run (see the `start`, `stop`, `pre` and
+                `post` keywords of LAMMPS' `run` command).
+            callback: called after each chunk with a `Snapshot` of the
+                engine, which must not be modified. Return `True` to stop
+                the run early. The session is only updated when the run
+                finishes.
+            run: when false, the session is only updated with the current
+                state of the engine (see `compute_async`).
+        """
         # Run the simulation
-        sol_param = self.session.get(oclass=simlammps.SolverParameter).one()
-        steps = sol_param.get(oclass=simlammps.IntegrationTime).one().steps
-        self._engine.run(steps)
+        if run:
+            self._run(self._steps(self.session), chunk_size, callback)
         # self._engine.write_dump("all", "atom", "atom_dump.txt")
 
         # Update the existing entities with the changes
+        self._update_observables()
+        self._live.clear()
+        self._stale = self._lazy
         self._add_delete_atoms_from_backend(self.session)
-        for individual in self.session.get(oclass=simlammps.Atom):
-            self._update_atom_from_backend(individual)
-        for individual in self.session.get(oclass=simlammps.Position):
-            self._update_position_from_backend(individual)
-        for individual in self.session.get(oclass=simlammps.Velocity):
-            self._update_velocity_from_backend(individual)
-        for individual in self.session.get(oclass=simlammps.Force):
-            self._update_force_from_backend(individual)
+        self._update_atoms_from_backend()
 
     def load(self, key: str) -> BinaryIO:
-        """Given the IRI of a video file object, yield its contents."""
-        return open(Path(self._videos[str(key)].name) / "video.mp4", "rb")
+        """Given the IRI of a video or trajectory, yield its contents.
+
+        Read trajectories with `LAMMPSTrajectory`.
+        """
+        return open(self._files[str(key)], "rb")
 
     def rename(self, key: str, new_key: str) -> None:
-        """Change the IRI reference to a video file."""
-        if str(key) in self._videos:
-            self._videos[str(new_key)] = self._videos[str(key)]
-            del self._videos[str(key)]
+        """Change the IRI reference to a video or trajectory file."""
+        if str(key) in self._files:
+            self._files[str(new_key)] = self._files[str(key)]
+            del self._files[str(key)]
 
     def hash(self, key: str) -> str:
-        """Get the hash of a video file."""
-        return get_hash(str(Path(self._videos[str(key)].name) / "video.mp4"))
+        """Get the hash of a video or trajectory file."""
+        return get_hash(str(self._files[str(key)]))
 
     def delete(self, key: str) -> None:
-        """Delete a video file.
+        """Delete a video or trajectory file.
 
-        This function is just a placeholder, as the video file should not be
+        This function is just a placeholder, as the file should not be
         deleted (LAMMPS will continue writing to it). It will be deleted
         when the session is closed.
         """
         pass
 
+    def triples(self, pattern: Pattern) -> Iterable[Triple]:
+        """Serve the values of positions, velocities and forces.
+
+        Only defined in lazy mode (see `__getattribute__`). The `vector` of
+        the subscribed positions, velocities and forces is fetched from the
+        engine the first time it is read after a run, and cached until the
+        next run. All other triples are served from the base graph.
+        """
+        subject, predicate, object_ = pattern
+        if not self._stale or predicate not in (None, simlammps.vector.iri):
+            yield from self.base.triples(pattern)
+            return
+        for triple in self.base.triples((subject, predicate, None)):
+            if triple[1] == simlammps.vector.iri:
+                value = self._live_vector(triple[0])
+                if value is not None:
+                    triple = (triple[0], triple[1], value)
+            if object_ is None or triple[2] == object_:
+                yield triple
+
+    def remove(self, pattern: Pattern) -> Iterable[Triple]:
+        """Stop serving engine values that the user is overwriting.
+
+        Only defined in lazy mode (see `__getattribute__`). The values of
+        the individuals whose `vector` is being removed are served from the
+        session until the next commit. Their outdated values stored on the
+        base graph are removed as usual.
+        """
+        subject, predicate, _ = pattern
+        if self._stale and predicate in (None, simlammps.vector.iri):
+            subjects = (
+                (subject,)
+                if subject is not None
+                else self.base.subjects(simlammps.vector.iri, None)
+            )
+            self._live.update((subject, None) for subject in subjects)
+        return iter(())
+
+    def query(self, query: str):
+        """Run SPARQL queries on the base graph.
+
+        Only defined in lazy mode, as the driver requires it along with
+        `triples`. Values served in lazy mode are not seen by SPARQL
+        queries.
+        """
+        return self.base.query(query)
+
+    def update(self, query: str):
+        """Run SPARQL updates on the base graph.
+
+        Only defined in lazy mode (see `query`).
+        """
+        return self.base.update(query)
+
+    def __getattribute__(self, name: str):
+        """Return getattr(self, name).
+
+        The driver looks the optional hooks up with `hasattr`. Outside lazy
+        mode, the hooks serving engine values are hidden, so that triples,
+        removals and SPARQL queries go straight to the base graph.
+        """
+        if name in {"triples", "remove", "query", "update"} and not (
+            super().__getattribute__("_lazy")
+        ):
+            raise AttributeError(name)
+        return super().__getattribute__(name)
+
     # Interface
     # ↑ ----- ↑
 
+    def _submit(
+        self,
+        session: Session,
+        chunk_size: Optional[int] = None,
+        callback: Optional[Callable[[Snapshot], Optional[bool]]] = None,
+    ) -> Future:
+        """Runs the simulation in the background.
+
+        Use `compute_async` instead of calling this method directly.
+
+        Args:
+            session: the wrapper session of this wrapper.
+            chunk_size: see `compute`.
+            callback: see `compute`, it is called from the worker thread.
+
+        Returns:
+            A future that is done once the run finished. Its `result`
+            updates the session.
+        """
+        session.commit()
+        steps = self._steps(session)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="SimLAMMPS"
+            )
+        future = _RunFuture(self, session)
+
+        def work() -> None:
+            """Runs the engine, leaving the session untouched."""
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                self._run(steps, chunk_size, callback)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(None)
+
+        self._running = True
+        try:
+            self._executor.submit(work)
+        except Exception:
+            self._running = False
+            raise
+        return future
+
+    @staticmethod
+    def _steps(session: Session) -> int:
+        """Gets the number of steps to run from a session.
+
+        Args:
+            session: session holding the solver parameters.
+        """
+        sol_param = session.get(oclass=simlammps.SolverParameter).one()
+        return int(sol_param.get(oclass=simlammps.IntegrationTime).one().steps)
+
+    def _run(
+        self,
+        steps: int,
+        chunk_size: Optional[int] = None,
+        callback: Optional[Callable[[Snapshot], Optional[bool]]] = None,
+    ):
+        """Runs the simulation, in chunks if requested.
+
+        The chunks are a single LAMMPS run: only the first chunk sets up
+        the run (e.g. builds the neighbor lists) and only the last one
+        prints the run statistics.
+
+        The observables are sampled at the end of the run and of each
+        chunk.
+
+        Args:
+            steps: total steps to run.
+            chunk_size: steps per chunk. No chunks when not specified.
+            callback: see `compute`.
+        """
+        if chunk_size is None:
+            self._run_command(steps)
+            self._sample_observables()
+            return
+        chunk_size = int(chunk_size)
+        if chunk_size <= 0:
+            raise ValueError("The chunk size must be a positive integer.")
+        start = self._engine.lmp.extract_global("ntimestep")
+        steps_done = 0
+        while steps_done < steps:
+            chunk = min(chunk_size, steps - steps_done)
+            self._run_command(
+                chunk,
+                "start",
+                start,
+                "stop",
+                start + steps,
+                "pre",
+                "yes" if steps_done == 0 else "no",
+                "post",
+                "yes" if steps_done + chunk == steps else "no",
+            )
+            steps_done += chunk
+            self._sample_observables()
+            if callback is not None and callback(
+                Snapshot(self, start + steps_done, steps_done, steps)
+            ):
+                break
+
+    def _run_command(self, *args: Any) -> None:
+        """Issues a LAMMPS `run` command.
+
+        In the background, the output is not captured as `PyLammps.run`
+        does: the capture redirects the standard output of the whole
+        process, so it breaks when several engines run at once (see
+        `compute_async`).
+
+        Args:
+            args: arguments of the command.
+        """
+        if self._running:
+            self._engine.command(" ".join(["run", *map(str, args)]))
+        else:
+            self._engine.run(*args)
+
+    def _sample_observables(self):
+        """Records the current value of each observable.
+
+        LAMMPS evaluates the thermodynamic keywords from the global
+        computes it tallies on the last step of every run, so no per-atom
+        data is transferred.
+        """
+        if not self._observables:
+            return
+        lmp = self._engine.lmp
+        step = lmp.extract_global("ntimestep")
+        values = dict()
+        for keyword, series in self._observables.values():
+            if keyword not in values:
+                values[keyword] = lmp.get_thermo(keyword)
+            series.append(step, values[keyword])
+
+    def _update_observables(self):
+        """Writes the last sample of each observable to the session."""
+        for identifier, (_, series) in self._observables.items():
+            _, values = series.series()
+            if len(values):
+                self.session.graph.set(
+                    (
+                        identifier,
+                        simlammps.lastValue.iri,
+                        Literal(float(values[-1])),
+                    )
+                )
+
+    def _save_checkpoint(self, path: Path) -> None:
+        """Writes the state of the simulation to a directory.
+
+        Use `save_checkpoint` instead of calling this method directly.
+
+        Args:
+            path: directory to write to, it is created if needed.
+        """
+        path.mkdir(parents=True, exist_ok=True)
+        self._engine.write_restart(path / "engine.restart")
+        # Every MPI rank holds the same session and mappers.
+        if self._engine.lmp.extract_setting("world_rank") != 0:
+            return
+        self.base.serialize(path / "session.nt", format="nt", encoding="utf-8")
+        self._atom_mapper.save(path / "atoms.npz")
+        self._material_mapper.save(path / "materials.npz")
+        np.save(path / "pending.npy", self._pending)
+        with open(path / "state.json", "w") as file:
+            json.dump({"stale": self._stale, "forces": self._forces_fix}, file)
+
+    def _tune_neighbor(
+        self,
+        skins: Iterable[float],
+        delays: Iterable[int],
+        steps: int,
+    ) -> Dict[str, Any]:
+        """Picks the neighbor list settings that run fastest.
+
+        Use `tune_neighbor` instead of calling this method directly.
+
+        Args:
+            skins: skin distances to try.
+            delays: delays between neighbor list rebuilds to try.
+            steps: steps of each trial run.
+
+        Returns:
+            The chosen settings.
+
+        Raises:
+            RuntimeError: when LAMMPS runs on several MPI ranks, or writes
+                trajectories or videos.
+            ValueError: when there are no settings to try.
+        """
+        lmp = self._engine.lmp
+        if lmp.extract_setting("world_size") > 1:
+            # Each rank would time the trials, and may choose differently.
+            raise RuntimeError(
+                "The neighbor list settings cannot be tuned on several MPI "
+                "ranks, tune them on one rank and pass them to the session."
+            )
+        if lmp.available_ids("dump"):
+            # LAMMPS cannot reset the timestep with active dumps, and
+            # dumping again would overwrite the files.
+            raise RuntimeError(
+                "The neighbor list settings cannot be tuned while "
+                "trajectories or videos are written, tune them before "
+                "adding any."
+            )
+        trials = list(product(skins, delays))
+        if not trials:
+            raise ValueError("No skin distances or delays to try.")
+        ids = np.sort(self._atom_mapper.ids())
+        if not len(ids):
+            return dict(self._neighbor)
+        step = lmp.extract_global("ntimestep")
+        positions = self._gather_atoms("x", ids)
+        velocities = self._gather_atoms("v", ids)
+        # Lammps internal id = pylammps id + 1
+        tags = (lmp.c_tagint * len(ids))(*(ids + 1).tolist())
+        images = lmp.gather_atoms_subset("image", 0, 1, len(ids), tags)
+
+        neighbor = dict(self._neighbor)
+        timings = dict()
+        try:
+            for skin, delay in trials:
+                self._set_neighbor(skin=skin, delay=delay)
+                start = perf_counter()
+                try:
+                    self._run_command(steps, "post", "no")
+                    timings[skin, delay] = perf_counter() - start
+                finally:
+                    # Start every trial (and the simulation) from the same
+                    # state.
+                    self._scatter_atoms("x", ids, positions)
+                    self._scatter_atoms("v", ids, velocities)
+                    lmp.scatter_atoms_subset(
+                        "image", 0, 1, len(ids), tags, images
+                    )
+                    self._engine.reset_timestep(step)
+        finally:
+            self._set_neighbor(**neighbor)
+        skin, delay = min(timings, key=timings.get)
+        self._set_neighbor(skin=skin, delay=delay)
+        return dict(self._neighbor)
+
+    def _subscribe(
+        self,
+        quantities: Iterable[str] = tuple(QUANTITIES),
+        atoms: Optional[
+            Iterable[Union[OntologyIndividual, Identifier]]
+        ] = None,
+    ) -> None:
+        """Choose the engine values that are written back after each run.
+
+        Values that are not subscribed stay on the engine and are never
+        copied to the session.
+
+        Args:
+            quantities: per-atom quantities to write back (see
+                `QUANTITIES`). Pass an empty iterable to write back none.
+            atoms: atoms (or their identifiers) whose values are written
+                back. All atoms when not specified.
+
+        Raises:
+            ValueError: when one of the quantities is not supported.
+        """
+        quantities = tuple(quantities)
+        for quantity in quantities:
+            if quantity not in self.QUANTITIES:
+                raise ValueError(
+                    f"Unsupported quantity {quantity}, choose among "
+                    f"{', '.join(self.QUANTITIES)}."
+                )
+        self._sync = quantities
+        self._sync_atoms = (
+            {
+                atom.identifier
+                if isinstance(atom, OntologyIndividual)
+                else atom
+                for atom in atoms
+            }
+            if atoms is not None
+            else None
+        )
+
     def _add_delete_atoms_from_backend(self, session: Session):
         """Update atoms in the wrapper with the information from the engine.
 
@@ -187,147 +1086,251 @@ class SimLAMMPS(Wrapper):
         # TODO: Check if the number of atoms changed
         #   If a new atom was created, create its position
 
-    def _update_atom_from_backend(self, atom: OntologyIndividual):
-        """Updates the given atom with new velocities and/or forces.
+    def _update_atoms_from_backend(self):
+        """Updates the subscribed quantities with the engine values.
 
-        Args:
-            atom: atom to be updated.
+        The values of the subscribed atoms are gathered from the engine at
+        once and then written to the ontology individuals using an index
+        built from the atom mapper. Atoms that had no velocity or force get
+        new individuals when the engine reports a non-zero value for them.
+
+        In lazy mode, nothing is gathered nor written, as the values are
+        fetched from the engine when read (see `triples`). Atoms without a
+        velocity or force individual do not get a new one.
         """
-        velocity = atom.get(oclass=simlammps.Velocity)
-        # The atom has no velocity
-        if not velocity:
-            self._update_velocity_from_backend(None, atom)
-        force = atom.get(oclass=simlammps.Force)
-        # The atom has no force
-        if not force:
-            self._update_force_from_backend(None, atom)
+        if self._lazy:
+            return
+        subset = self._sync_atoms is not None
+        if subset:
+            atom_ids = self._atom_mapper.get_many(
+                identifier
+                for identifier in self._sync_atoms
+                if identifier in self._atom_mapper
+            )
+        else:
+            atom_ids = self._atom_mapper.ids()
+        # Atoms read from a data file are not in the session yet.
+        atom_ids = np.setdiff1d(atom_ids, self._pending)
+
+        graph = self.session.graph
+        for quantity in self._sync:
+            oclass, name = self.QUANTITIES[quantity]
+            if subset:
+                values = self._gather_atoms(name, atom_ids)
+            else:
+                values = self._gather_atoms(name)[atom_ids]
+            ids, parts = self._index_atom_parts(
+                oclass, atom_ids if subset else None
+            )
+            rows = np.searchsorted(atom_ids, ids)
+            for part, value in zip(parts, values[rows]):
+                graph.set(
+                    (
+                        part,
+                        simlammps.vector.iri,
+                        Literal(Vector(value), datatype=Vector.iri),
+                    )
+                )
+            if oclass is simlammps.Position:
+                continue
+            # There was no velocity/force and now there is
+            missing = ~np.isin(atom_ids, ids) & np.any(values != 0, axis=1)
+            if not missing.any():
+                continue
+            identifiers = self._atom_mapper.get_many(atom_ids[missing])
+            for identifier, value in zip(identifiers, values[missing]):
+                ontology_atom = self.session.from_identifier(identifier)
+                ontology_atom.connect(
+                    oclass(vector=value), rel=simlammps.hasPart
+                )
+            self._parts.pop(oclass, None)
 
-    def _update_position_from_backend(
-        self,
-        position: OntologyIndividual,
-        ontology_atom: Optional[OntologyIndividual] = None,
-    ):
-        """Updates a given position object with the latest values in the engine.
+    def _live_vector(self, part: URIRef) -> Optional[Literal]:
+        """Fetches the `vector` of an individual from the engine.
+
+        The value is cached until the next run or commit. Individuals
+        whose value is not fetched from the engine are cached as None.
 
         Args:
-            position: position object to update.
-            ontology_atom: atom that has said position.
+            part: identifier of the individual.
+
+        Returns:
+            The value as a literal, or None when the individual is not a
+            subscribed quantity of an atom on the engine.
         """
-        if ontology_atom is None:
-            ontology_atom = self._parent_atom(position)
-        lammps_atom = self._lammps_atom(ontology_atom)
-        position.vector = tuple(lammps_atom.position)
+        if part in self._live:
+            return self._live[part]
+        value = None
+        for quantity in self._sync:
+            oclass, name = self.QUANTITIES[quantity]
+            if (part, RDF.type, oclass.iri) not in self.base:
+                continue
+            for atom in self.base.subjects(None, part):
+                if atom in self._atom_mapper and (
+                    self._sync_atoms is None or atom in self._sync_atoms
+                ):
+                    ids = np.array([self._atom_mapper.get(atom)])
+                    value = Literal(
+                        Vector(self._gather_atoms(name, ids)[0]),
+                        datatype=Vector.iri,
+                    )
+                    break
+            break
+        self._live[part] = value
+        return value
 
-    def _update_velocity_from_backend(
-        self,
-        velocity: Optional[OntologyIndividual],
-        ontology_atom: Optional[OntologyIndividual] = None,
-    ):
-        """Update a given velocity object with the latest values in the engine.
-
-        If the previous `velocity` was `None`, an ontology_atom MUST be given
-        (in case it has to be initialised). If there was a pre-existing value,
-        the atom is not required and could be computed.
-
-        Args:
-            velocity: velocity object to update.
-            ontology_atom: atom that has said velocity.
-        """
-        if ontology_atom is None:
-            ontology_atom = self._parent_atom(velocity)
-        lammps_atom = self._lammps_atom(ontology_atom)
-        if velocity is not None:
-            velocity.vector = tuple(lammps_atom.velocity)
-        # There was no velocity and now there is
-        elif not np.array_equal(lammps_atom.velocity, (0, 0, 0)):
-            if ontology_atom is None:
-                message = "Atom is required if there was no previous velocity"
-                raise ValueError(message)
-            velocity = simlammps.Velocity(vector=lammps_atom.velocity)
-            ontology_atom.connect(velocity, rel=simlammps.hasPart)
-
-    def _update_force_from_backend(
-        self,
-        force: Optional[OntologyIndividual],
-        ontology_atom: Optional[OntologyIndividual] = None,
-    ):
-        """Updates a given force object with the latest values in the engine.
+    def _atom_views(self) -> AtomViews:
+        """Wraps the per-atom arrays of the engine without copying them.
+
+        Use `atom_views` instead of calling this method directly.
+        """
+        lmp = self._engine.lmp
+        nlocal = lmp.extract_setting("nlocal")
+        if not nlocal:
+            empty = np.empty((0, 3))
+            return AtomViews(
+                np.empty(0, dtype=object),
+                empty,
+                empty,
+                empty,
+                np.empty(0, dtype=np.int32),
+            )
+        arrays = []
+        for name in ("x", "v", "f", "type"):
+            # Without `nelem`, the ghost atoms would be included.
+            array = lmp.numpy.extract_atom(name, nelem=nlocal)
+            array.flags.writeable = False
+            arrays.append(array)
+        # Lammps internal id = pylammps id + 1
+        tags = lmp.numpy.extract_atom("id", nelem=nlocal)
+        identifiers = self._atom_mapper.get_many(tags.astype(np.int64) - 1)
+        return AtomViews(identifiers, *arrays)
+
+    def _gather_atoms(
+        self, name: str, ids: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Gathers a per-atom vector quantity of atoms in the engine.
 
         Args:
-            force: force object to update.
-            ontology_atom: atom that has said force.
+            name: name of the per-atom quantity in LAMMPS (`x`, `v`, `f`).
+            ids: pylammps ids of the atoms to gather. All atoms when not
+                specified.
+
+        Returns:
+            Array with one row per atom. When ids are given, the rows
+            follow their order. Otherwise, the row `i` holds the value for
+            the atom with pylammps id `i`.
         """
-        if ontology_atom is None:
-            ontology_atom = self._parent_atom(force)
-        lammps_atom = self._lammps_atom(ontology_atom)
-        if force is not None:
-            force.vector = tuple(lammps_atom.force)
-        # There was no force and now there is
-        elif not np.array_equal(lammps_atom.force, (0, 0, 0)):
-            if ontology_atom is None:
-                message = "Atom is required if there was no previous force"
-                raise ValueError(message)
-            force = simlammps.Force(vector=lammps_atom.force)
-            ontology_atom.connect(force, rel=simlammps.hasPart)
+        lmp = self._engine.lmp
+        if ids is not None:
+            if not len(ids):
+                return np.zeros((0, 3))
+            # Lammps internal id = pylammps id + 1
+            tags = (lmp.c_tagint * len(ids))(*(np.asarray(ids) + 1).tolist())
+            return np.ctypeslib.as_array(
+                lmp.gather_atoms_subset(name, 1, 3, len(ids), tags)
+            ).reshape(-1, 3)
+        if not lmp.get_natoms():
+            return np.zeros((0, 3))
+        tags = np.ctypeslib.as_array(lmp.gather_atoms_concat("id", 0, 1))
+        values = np.ctypeslib.as_array(
+            lmp.gather_atoms_concat(name, 1, 3)
+        ).reshape(-1, 3)
+        # Lammps internal id = pylammps id + 1
+        gathered = np.zeros((tags.max(), 3))
+        gathered[tags - 1] = values
+        return gathered
+
+    def _index_atom_parts(
+        self, oclass: OntologyClass, ids: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, List[URIRef]]:
+        """Finds the individuals of a given class that belong to an atom.
+
+        When no atoms are specified, a single pass over the individuals of
+        the class is performed, looking up their parent atoms directly on
+        the session's graph. The result is kept until individuals are
+        added or deleted. Otherwise, the graph is only looked up around the
+        given atoms.
+
+        Args:
+            oclass: class of the individuals to index (e.g. Position).
+            ids: pylammps ids of the atoms to consider. All atoms when not
+                specified.
 
-    def _add_by_type(self, individual: OntologyIndividual):
-        """Adds ontology individuals based on their type to the engine.
+        Returns:
+            The pylammps ids of the parent atoms and the identifiers of
+            the individuals, in matching order.
+        """
+        graph = self.session.graph
+        atoms, parts = [], []
+        if ids is not None:
+            for atom in self._atom_mapper.get_many(ids):
+                for part in graph.objects(atom, None):
+                    if (part, RDF.type, oclass.iri) in graph:
+                        atoms.append(atom)
+                        parts.append(part)
+        elif oclass in self._parts:
+            return self._parts[oclass]
+        else:
+            for part in graph.subjects(RDF.type, oclass.iri):
+                for subject in graph.subjects(None, part):
+                    if subject in self._atom_mapper:
+                        atoms.append(subject)
+                        parts.append(part)
+                        break
+            self._parts[oclass] = self._atom_mapper.get_many(atoms), parts
+            return self._parts[oclass]
+        return self._atom_mapper.get_many(atoms), parts
+
+    def _bucket(
+        self, operation: str, individuals: Iterable[OntologyIndividual]
+    ) -> Dict[OntologyClass, List[OntologyIndividual]]:
+        """Sorts ontology individuals by the handler for their class.
+
+        The handler for each combination of classes is looked up once and
+        then kept. Like in the dispatch tables, when an individual belongs
+        to several of the classes, the one listed last takes precedence.
 
         Args:
-             individual: object to add.
+            operation: `add`, `update` or `remove` (see `_HANDLERS`).
+            individuals: ontology individuals to sort.
+
+        Returns:
+            The individuals of each class of the dispatch table, in the
+            order of the table and sorted by identifier, so that every MPI
+            rank issues the same engine commands. Individuals that no
+            handler processes are left out.
         """
-        if individual.is_a(simlammps.Atom):
-            self._add_atom(individual)
-        elif individual.is_a(simlammps.Velocity):
-            ontology_atom = self._parent_atom(individual)
-            if ontology_atom not in self.added | self.updated:
-                lammps_atom = self._lammps_atom(ontology_atom)
-                self._set_velocity(lammps_atom, individual.vector.data)
-        elif individual.is_a(simlammps.Force):
-            ontology_atom = self._parent_atom(individual)
-            if ontology_atom not in self.added | self.updated:
-                # Lammps internal id = pylammps id + 1
-                lammps_atom_id = (
-                    self._atom_mapper.get(ontology_atom.identifier) + 1
+        handlers = self._HANDLERS[operation]
+        dispatch = self._dispatch.setdefault(operation, dict())
+        buckets = [[] for _ in handlers]
+        for individual in individuals:
+            classes = individual.classes
+            if classes not in dispatch:
+                superclasses = set().union(
+                    *(class_.superclasses for class_ in classes)
                 )
-                self._set_force(lammps_atom_id, individual.vector.data)
-        elif individual.is_a(simlammps.Position):
-            ontology_atom = self._parent_atom(individual)
-            if ontology_atom not in self.added | self.updated:
-                lammps_atom = self._lammps_atom(ontology_atom)
-                self._set_position(lammps_atom, individual.vector.data)
-        elif individual.is_a(simlammps.Material):
-            self._add_material(individual)
-        elif individual.is_a(simlammps.SimulationBox):
-            if any(x.is_a(simlammps.SimulationBox) for x in self.deleted):
-                self._update_simulation_box(individual)
-            else:
-                self._add_simulation_box(individual)
-        elif individual.is_a(simlammps.Face):
-            parent_box = individual.get(
-                oclass=simlammps.SimulationBox
-            ).inverse.one()
-            self._update_simulation_box(parent_box)
-            # As in `_update_by_type`, the simulation box info can be updated
-            # several times on the engine, but this is not an issue.
-        elif individual.is_a(simlammps.BoundaryCondition):
-            parent_box = (
-                individual.get(oclass=simlammps.Face)
-                .inverse.one()
-                .get(oclass=simlammps.SimulationBox)
-                .inverse.one()
-            )
-            self._update_simulation_box(parent_box)
-            # As in `_update_by_type`, the simulation box info can be updated
-            # several times on the engine, but this is not an issue.
-        elif individual.is_a(simlammps.LennardJones612):
-            self._add_pair_style(individual)
-        elif individual.is_a(simlammps.Thermostat):
-            self._define_fix(individual)
-        elif individual.is_a(simlammps.Video):
-            temp_dir = TemporaryDirectory()
-            path = Path(temp_dir.name) / "video.mp4"
-            self._videos[str(individual.identifier)] = temp_dir
+                indices = [
+                    i
+                    for i, (oclass, _) in enumerate(handlers)
+                    if oclass in superclasses
+                ]
+                dispatch[classes] = max(indices) if indices else None
+            if dispatch[classes] is not None:
+                buckets[dispatch[classes]].append(individual)
+        for bucket in buckets:
+            bucket.sort(key=lambda x: x.identifier)
+        return dict(zip((oclass for oclass, _ in handlers), buckets))
+
+    def _add_videos(self, videos: List[OntologyIndividual]):
+        """Starts producing the given videos on the engine.
+
+        Args:
+            videos: video individuals.
+        """
+        for individual in videos:
+            path = self._output_file("mp4")
+            self._files[str(individual.identifier)] = path
             video = (
                 individual.steps,
                 path,
@@ -335,139 +1338,298 @@ class SimLAMMPS(Wrapper):
                 individual.height,
             )
             self._output_video(*video)
-        else:
-            # message = "Adding {} does not add anything to the engine."
-            # (message.format(individual))
-            pass
 
-    def _update_by_type(self, individual: OntologyIndividual):
-        """Updates ontology individuals objects based on their type.
+    def _add_trajectories(self, trajectories: List[OntologyIndividual]):
+        """Starts writing the given trajectories on the engine.
 
         Args:
-            individual: ontology individual to update
+            trajectories: trajectory individuals.
         """
-        # Nothing if the atom is changed (should be the pos, vel or force)
-        if individual.is_a(simlammps.Position):
-            ontology_atom = self._parent_atom(individual)
-            if ontology_atom not in self.updated | self.added:
-                lammps_atom = self._lammps_atom(ontology_atom)
-                self._set_position(lammps_atom, individual.vector.data)
-        elif individual.is_a(simlammps.Velocity):
-            ontology_atom = self._parent_atom(individual)
-            if ontology_atom not in self.updated | self.added:
-                lammps_atom = self._lammps_atom(ontology_atom)
-                self._set_velocity(lammps_atom, individual.vector.data)
-        elif individual.is_a(simlammps.Force):
-            ontology_atom = self._parent_atom(individual)
-            if ontology_atom not in self.updated | self.added:
-                # Lammps internal id = pylammps id + 1
-                lammps_atom_id = (
-                    self._atom_mapper.get(ontology_atom.identifier) + 1
-                )
-                self._set_force(lammps_atom_id, individual.vector.data)
-        elif individual.is_a(simlammps.Atom):
-            ontology_atom = individual
-            lammps_atom = self._lammps_atom(ontology_atom)
-            lammps_atom_id = (
-                self._atom_mapper.get(ontology_atom.identifier) + 1
-            )
-            position = ontology_atom.get(oclass=simlammps.Position).any()
-            velocity = ontology_atom.get(oclass=simlammps.Velocity).any()
-            force = ontology_atom.get(oclass=simlammps.Force).any()
-            self._set_position(
-                lammps_atom,
-                position.vector.data if position is not None else [0, 0, 0],
-            )
-            self._set_velocity(
-                lammps_atom,
-                velocity.vector.data if velocity is not None else [0, 0, 0],
-            )
-            self._set_force(
-                lammps_atom_id,
-                force.vector.data if force is not None else [0, 0, 0],
-            )
-        elif individual.is_a(simlammps.Face):
-            box = individual.get(oclass=simlammps.SimulationBox).inverse.one()
-            self._update_simulation_box(box)
-            # The above can in fact update the simulation box several times
-            # if various faces (and other combinations like one face and the
-            # box) are updated or added, but updating it several times does
-            # not cause a problem.
-        elif individual.is_a(simlammps.BoundaryCondition):
-            box = (
-                individual.get(oclass=simlammps.Face)
-                .inverse.one()
-                .get(oclass=simlammps.SimulationBox)
-                .inverse.one()
+        for individual in trajectories:
+            compressed = bool(individual.compressed)
+            path = self._output_file("gz" if compressed else "bin")
+            self._files[str(individual.identifier)] = path
+            self._output_trajectory(
+                individual.steps,
+                path,
+                (individual.columns or self.TRAJECTORY_COLUMNS).split(),
+                compressed,
             )
-            self._update_simulation_box(box)
-        elif individual.is_a(simlammps.Material):
-            self._add_material(individual)
-        elif individual.is_a(simlammps.SimulationBox):
-            self._update_simulation_box(individual)
-        elif individual.is_a(simlammps.LennardJones612):
-            self._engine.units("lj")
-            self._add_by_type(individual)
-        elif individual.is_a(simlammps.Thermostat):
+
+    @staticmethod
+    def _update_videos(videos: List[OntologyIndividual]):
+        """Warns that changing a video or trajectory has no effect.
+
+        Args:
+            videos: video or trajectory individuals.
+        """
+        for individual in videos:
+            message = (
+                "Changing {} does not affect the engine. If you want to "
+                "produce an output with different characteristics, "
+                "create a new one."
+            )
+            print(message.format(individual))
+
+    def _add_observables(self, observables: List[OntologyIndividual]):
+        """Starts sampling the given observables after each run.
+
+        Args:
+            observables: observable individuals.
+        """
+        for individual in observables:
+            keyword = next(
+                keyword
+                for oclass, keyword in self.OBSERVABLES.items()
+                if individual.is_a(oclass)
+            )
+            self._observables[individual.identifier] = (
+                keyword,
+                RingBuffer(self._history),
+            )
+
+    def _remove_observables(self, observables: List[OntologyIndividual]):
+        """Stops sampling the given observables.
+
+        Args:
+            observables: observable individuals.
+        """
+        for individual in observables:
+            self._observables.pop(individual.identifier, None)
+
+    def _define_fixes(self, thermostats: List[OntologyIndividual]):
+        """Defines the fixes for the given thermostats.
+
+        Args:
+            thermostats: thermostat individuals.
+        """
+        for individual in thermostats:
             self._define_fix(individual)
-        elif individual.is_a(simlammps.Video):
+
+    def _add_simulation_boxes(self, boxes: List[OntologyIndividual]):
+        """Adds simulation boxes, or replaces the deleted one.
+
+        Args:
+            boxes: simulation box individuals.
+        """
+        replaced = any(x.is_a(simlammps.SimulationBox) for x in self.deleted)
+        for individual in boxes:
+            if replaced:
+                self._update_simulation_box(individual)
+            else:
+                self._add_simulation_box(individual)
+
+    def _update_simulation_boxes(self, boxes: List[OntologyIndividual]):
+        """Updates simulation boxes.
+
+        Args:
+            boxes: simulation box individuals.
+        """
+        for individual in boxes:
+            self._update_simulation_box(individual)
+
+    def _add_lattices(self, lattices: List[OntologyIndividual]):
+        """Fills the simulation box or regions of it with atoms.
+
+        Args:
+            lattices: lattice individuals.
+        """
+        for individual in lattices:
+            self._fill_lattice(individual)
+
+    @staticmethod
+    def _update_lattices(lattices: List[OntologyIndividual]):
+        """Warns that changing a lattice does not move its atoms.
+
+        Args:
+            lattices: lattice individuals.
+        """
+        for individual in lattices:
             message = (
-                "Changing video {} does not affect the engine. If you "
-                "want to produce a video with different "
-                "characteristics, create a new video object."
+                "Changing lattice {} does not affect the atoms already "
+                "created. Change the atoms instead, or create a new "
+                "lattice."
             )
             print(message.format(individual))
-        else:
-            # message = "Updating {} does not affect the engine."
-            # print(message.format(individual))
-            pass
 
-    def _remove_by_type(
-        self,
-        individual: OntologyIndividual,
-    ):
-        """Removes ontology individuals based on their type on the engine.
+    def _update_parent_boxes(self, individuals: List[OntologyIndividual]):
+        """Updates the simulation boxes of faces or boundary conditions.
+
+        Each simulation box is updated once, no matter how many of its
+        faces or boundary conditions changed. Deleted boxes are skipped.
+
+        Args:
+            individuals: face or boundary condition individuals.
+        """
+        boxes = dict()
+        for individual in individuals:
+            if individual.is_a(simlammps.BoundaryCondition):
+                individual = individual.get(
+                    oclass=simlammps.Face
+                ).inverse.one()
+            box = individual.get(oclass=simlammps.SimulationBox).inverse.one()
+            if box not in self.deleted:
+                boxes[box.identifier] = box
+        for box in boxes.values():
+            self._update_simulation_box(box)
+
+    def _add_materials(self, materials: List[OntologyIndividual]):
+        """Adds materials to the engine.
+
+        Args:
+            materials: material individuals.
+        """
+        for individual in materials:
+            self._add_material(individual)
+
+    def _add_pair_styles(self, pair_styles: List[OntologyIndividual]):
+        """Defines the given pair styles on the engine.
+
+        Args:
+            pair_styles: lennard-jones individuals.
+        """
+        for individual in pair_styles:
+            self._add_pair_style(individual)
+
+    def _update_pair_styles(self, pair_styles: List[OntologyIndividual]):
+        """Redefines the given pair styles on the engine.
+
+        Args:
+            pair_styles: lennard-jones individuals.
+        """
+        self._engine.units("lj")
+        self._add_pair_styles(pair_styles)
+
+    def _update_atoms(self, atoms: List[OntologyIndividual]):
+        """Resets the position, velocity and force of updated atoms.
 
         Args:
-            individual: ontology individual to remove.
+            atoms: atom individuals.
         """
-        if individual.is_a(simlammps.Atom):
+        lammps_atom_ids = self._atom_mapper.get_many(
+            atom.identifier for atom in atoms
+        )
+        positions = np.zeros((len(atoms), 3))
+        velocities = np.zeros((len(atoms), 3))
+        for i, atom in enumerate(atoms):
+            position = atom.get(oclass=simlammps.Position).any()
+            if position is not None:
+                positions[i] = position.vector.data
+            velocity = atom.get(oclass=simlammps.Velocity).any()
+            if velocity is not None:
+                velocities[i] = velocity.vector.data
+            force = atom.get(oclass=simlammps.Force).any()
             # Lammps internal id = pylammps id + 1
-            lammps_atom_id = self._atom_mapper.get(individual.identifier) + 1
-            self._remove_atom(lammps_atom_id)
-        elif individual.is_a(simlammps.Position):
-            ontology_atom = self._parent_atom(individual)
-            if ontology_atom not in self.deleted:
-                lammps_atom = self._lammps_atom(ontology_atom)
-                self._set_position(lammps_atom, [0, 0, 0])
-        elif individual.is_a(simlammps.Velocity):
+            if force is not None:
+                self._set_force(lammps_atom_ids[i] + 1, force.vector.data)
+            else:
+                self._unset_force(lammps_atom_ids[i] + 1)
+        self._scatter_atoms("x", lammps_atom_ids, positions)
+        self._scatter_atoms("v", lammps_atom_ids, velocities)
+        # Parts may have been connected to or disconnected from the atoms.
+        self._parts.clear()
+
+    def _set_positions(self, positions: List[OntologyIndividual]):
+        """Sets the positions of atoms that were not added nor updated.
+
+        Args:
+            positions: position individuals.
+        """
+        self._scatter_atoms("x", *self._vectors_of_atoms(positions))
+
+    def _set_velocities(self, velocities: List[OntologyIndividual]):
+        """Sets the velocities of atoms that were not added nor updated.
+
+        Args:
+            velocities: velocity individuals.
+        """
+        self._scatter_atoms("v", *self._vectors_of_atoms(velocities))
+
+    def _set_forces(self, forces: List[OntologyIndividual]):
+        """Sets the forces of atoms that were not added nor updated.
+
+        Args:
+            forces: force individuals.
+        """
+        for lammps_atom_id, force in zip(*self._vectors_of_atoms(forces)):
+            # Lammps internal id = pylammps id + 1
+            self._set_force(lammps_atom_id + 1, force)
+
+    def _reset_positions(self, positions: List[OntologyIndividual]):
+        """Resets the positions of atoms that were not deleted.
+
+        Args:
+            positions: deleted position individuals.
+        """
+        lammps_atom_ids = self._kept_atoms(positions)
+        self._scatter_atoms(
+            "x", lammps_atom_ids, np.zeros((len(lammps_atom_ids), 3))
+        )
+
+    def _reset_velocities(self, velocities: List[OntologyIndividual]):
+        """Resets the velocities of atoms that were not deleted.
+
+        Args:
+            velocities: deleted velocity individuals.
+        """
+        lammps_atom_ids = self._kept_atoms(velocities)
+        self._scatter_atoms(
+            "v", lammps_atom_ids, np.zeros((len(lammps_atom_ids), 3))
+        )
+
+    def _unset_forces(self, forces: List[OntologyIndividual]):
+        """Stops imposing forces on atoms that were not deleted.
+
+        Args:
+            forces: deleted force individuals.
+        """
+        for lammps_atom_id in self._kept_atoms(forces):
+            # Lammps internal id = pylammps id + 1
+            self._unset_force(lammps_atom_id + 1)
+
+    def _vectors_of_atoms(
+        self, individuals: List[OntologyIndividual]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Gets the vectors of parts of atoms that were not added nor updated.
+
+        The values of added and updated atoms are already set when
+        processing the atoms themselves.
+
+        Args:
+            individuals: position, velocity or force individuals.
+
+        Returns:
+            The pylammps ids of the atoms and the vectors, in matching order.
+        """
+        atoms, vectors = [], []
+        for individual in individuals:
             ontology_atom = self._parent_atom(individual)
-            if ontology_atom not in self.deleted:
-                lammps_atom = self._lammps_atom(ontology_atom)
-                self._set_velocity(lammps_atom, [0, 0, 0])
-        elif individual.is_a(simlammps.Force):
+            if (
+                ontology_atom is not None
+                and ontology_atom not in self._changed
+            ):
+                atoms.append(ontology_atom.identifier)
+                vectors.append(individual.vector.data)
+        return (
+            self._atom_mapper.get_many(atoms),
+            np.array(vectors, dtype=float).reshape(-1, 3),
+        )
+
+    def _kept_atoms(self, individuals: List[OntologyIndividual]) -> np.ndarray:
+        """Gets the atoms of deleted parts, unless also deleted.
+
+        Args:
+            individuals: deleted position, velocity or force individuals.
+
+        Returns:
+            The pylammps ids of the atoms.
+        """
+        atoms = []
+        for individual in individuals:
             ontology_atom = self._parent_atom(individual)
-            if ontology_atom not in self.deleted:
-                # Lammps internal id = pylammps id + 1
-                lammps_atom_id = (
-                    self._atom_mapper.get(ontology_atom.identifier) + 1
-                )
-                self._set_force(lammps_atom_id, [0, 0, 0])
-        elif individual.is_a(simlammps.BoundaryCondition):
-            parent_box = (
-                individual.get(oclass=simlammps.Face)
-                .inverse.one()
-                .get(oclass=simlammps.SimulationBox)
-                .inverse.one()
-            )
-            if parent_box not in self.deleted:
-                self._update_simulation_box(parent_box)
-            # As in `_update_by_type`, the simulation box info can be updated
-            # several times on the engine, but this is not an issue.
-        else:
-            # message = "Removing {} does not affect the engine."
-            # print(message.format(individual))
-            pass
+            if ontology_atom is not None and ontology_atom not in self.deleted:
+                atoms.append(ontology_atom.identifier)
+        return self._atom_mapper.get_many(atoms)
 
     def _output_video(self, steps: int, name: str, width: int, height: int):
         """Saves the execution of LAMMPS to a video.
@@ -491,33 +1653,221 @@ class SimLAMMPS(Wrapper):
             height,
         )
 
-    def _add_atom(self, atom: OntologyIndividual):
-        """Adds one atom to the engine.
+    def _output_file(self, extension: str) -> Path:
+        """Returns a new path in the output directory of the session.
+
+        Args:
+            extension: extension of the file.
+        """
+        return Path(self._output_dir.name) / f"{len(self._files)}.{extension}"
+
+    def _output_trajectory(
+        self, steps: int, name: Path, columns: List[str], compressed: bool
+    ):
+        """Saves per-atom quantities of the atoms every few steps.
+
+        The atoms are sorted by their LAMMPS id in each frame.
 
         Args:
-            atom: Atom to add.
+            steps: number of steps between frames.
+            name: name for the file.
+            columns: per-atom quantities (keywords of the `custom` style
+                of the `dump` command of LAMMPS).
+            compressed: write text compressed with gzip instead of binary.
         """
-        material_id = atom.get(oclass=simlammps.Material).one().identifier
+        dump = f"trajectory{len(self._files)}"
+        style = "custom/gz" if compressed else "custom"
+        self._engine.dump(dump, "all", style, steps, name, *columns)
+        self._engine.dump_modify(dump, "sort", "id")
+        if compressed:
+            self._engine.dump_modify(dump, "format", "float", "%.17g")
+
+    def _add_atoms(self, atoms: List[OntologyIndividual]):
+        """Adds several atoms to the engine at once.
+
+        The types, positions and velocities of the atoms are collected into
+        contiguous arrays and the atoms are created with a single call to
+        the engine.
+
+        Args:
+            atoms: atoms to add.
+
+        Raises:
+            RuntimeError: when the engine did not create all the atoms
+                (e.g. because some of them lie outside the simulation box).
+                None of the atoms are kept then.
+        """
+        number = len(atoms)
+        atom_types = np.empty(number, dtype=int)
+        positions = np.empty((number, 3))
+        velocities = np.zeros((number, 3))
+        forces = dict()
+        for i, atom in enumerate(atoms):
+            material_id = atom.get(oclass=simlammps.Material).one().identifier
+            # Atom types start at 1
+            atom_types[i] = self._material_mapper.get(material_id) + 1
+            positions[i] = (
+                atom.get(oclass=simlammps.Position).one().vector.data
+            )
+            velocity = atom.get(oclass=simlammps.Velocity).any()
+            if velocity is not None:
+                velocities[i] = velocity.vector.data
+            force = atom.get(oclass=simlammps.Force).any()
+            if force is not None:
+                forces[i] = force.vector.data
+        lammps_atom_ids = self._create_atoms(
+            [atom.identifier for atom in atoms],
+            atom_types,
+            positions,
+            velocities,
+        )
+        for i, force_vector in forces.items():
+            # LAMMPS internal id = pylammps id + 1
+            self._set_force(lammps_atom_ids[i] + 1, force_vector)
+
+    def _add_atom_arrays(
+        self,
+        material: Identifier,
+        positions: np.ndarray,
+        velocities: Optional[np.ndarray],
+        forces: Optional[np.ndarray],
+        identifiers: Optional[List[Identifier]],
+    ) -> np.ndarray:
+        """Adds atoms of one material to the engine, but not to the session.
+
+        Use `add_atoms` instead of calling this method directly. The atoms
+        are left pending, to be materialized on request (see
+        `_materialize`).
+
+        Args:
+            material: identifier of a committed material.
+            positions: positions of the atoms (N x 3).
+            velocities: velocities of the atoms (N x 3). Zero when not
+                specified.
+            forces: forces to impose on the atoms (N x 3). None when not
+                specified.
+            identifiers: identifiers for the atoms. Random ones when not
+                specified.
+
+        Returns:
+            The pylammps ids of the atoms.
+        """
+        number = len(positions)
+        if identifiers is None:
+            identifiers = [
+                URIRef(ENTITY_IRI_PREFIX + str(uuid4())) for _ in range(number)
+            ]
         # Atom types start at 1
-        atom_type = self._material_mapper.get(material_id) + 1
-        position_vector = atom.get(oclass=simlammps.Position).one().vector.data
-
-        # Position vector has x, y and z components
-        self._engine.create_atoms(atom_type, "single", *position_vector)
-        # Add the atom to the mapper
-        lammps_atom_id = self._atom_mapper.add(atom.identifier)
-        lammps_atom = self._engine.atoms[lammps_atom_id]
-
-        velocity = atom.get(oclass=simlammps.Velocity)
-        if velocity:
-            velocity = velocity.one()
-            self._set_velocity(lammps_atom, velocity.vector.data)
-
-        force = atom.get(oclass=simlammps.Force)
-        if force:
-            force = force.one()
+        atom_type = self._material_mapper.get(material) + 1
+        lammps_atom_ids = self._create_atoms(
+            identifiers,
+            np.full(number, atom_type),
+            positions,
+            np.zeros((number, 3)) if velocities is None else velocities,
+        )
+        self._pending = np.union1d(self._pending, lammps_atom_ids)
+        if forces is not None:
             # LAMMPS internal id = pylammps id + 1
-            self._set_force(lammps_atom_id + 1, force.vector.data)
+            self._forces.update(zip((lammps_atom_ids + 1).tolist(), forces))
+            self._apply_forces()
+        return lammps_atom_ids
+
+    def _create_atoms(
+        self,
+        identifiers: List[Identifier],
+        atom_types: np.ndarray,
+        positions: np.ndarray,
+        velocities: np.ndarray,
+    ) -> np.ndarray:
+        """Creates atoms on the engine with a single call.
+
+        Args:
+            identifiers: identifiers of the atoms.
+            atom_types: LAMMPS atom types of the atoms.
+            positions: positions of the atoms (N x 3).
+            velocities: velocities of the atoms (N x 3).
+
+        Raises:
+            RuntimeError: when the engine did not create all the atoms
+                (e.g. because some of them lie outside the simulation box).
+                None of the atoms are kept then.
+
+        Returns:
+            The pylammps ids of the atoms.
+        """
+        number = len(identifiers)
+        # Add the atoms to the mapper
+        lammps_atom_ids = self._atom_mapper.add_many(identifiers)
+
+        # The library call appends the atoms after the local ones without
+        # clearing the ghost atoms left by the last run, which corrupts the
+        # atom map. Creating no atoms with the command clears them.
+        if self._engine.lmp.extract_setting("nghost"):
+            self._engine.create_atoms(1, "random", 0, 1, "NULL")
+
+        # Lammps internal id = pylammps id + 1
+        created = self._engine.lmp.create_atoms(
+            number,
+            (lammps_atom_ids + 1).tolist(),
+            np.asarray(atom_types).tolist(),
+            np.asarray(positions, dtype=float).ravel().tolist(),
+            np.asarray(velocities, dtype=float).ravel().tolist(),
+        )
+        if created != number:
+            # Leave neither the atoms that were created nor their ids.
+            self._delete_atoms(lammps_atom_ids)
+            raise RuntimeError(
+                f"Only {created} out of {number} atoms could be created. "
+                f"Check that all the atoms lie inside the simulation box."
+            )
+        return lammps_atom_ids
+
+    def _find_suffixes(self, cmdargs: List[str]) -> Tuple[str, ...]:
+        """Chooses the accelerator packages to use.
+
+        The OPT package is the fastest on a single thread. The OPENMP
+        package is preferred when a number of threads is given.
+
+        Args:
+            cmdargs: command-line arguments of the engine.
+
+        Returns:
+            The suffixes of the accelerated variants of the styles, in
+            order of preference.
+        """
+        if not self._accelerate or {"-sf", "-suffix"} & set(cmdargs):
+            return ()
+        packages = self._engine.lmp.installed_packages
+        if self._threads and "OPENMP" not in packages:
+            print(
+                "The OPENMP package is not installed, ignoring the number "
+                "of threads."
+            )
+        return tuple(
+            suffix
+            for package, suffix in (
+                (("OPENMP", "omp"), ("OPT", "opt"))
+                if self._threads
+                else (("OPT", "opt"),)
+            )
+            if package in packages
+        )
+
+    def _accelerated(self, category: str, style: str) -> str:
+        """Picks the fastest variant of a style that the engine offers.
+
+        Args:
+            category: category of the style (`pair`, `fix`, ...).
+            style: name of the plain style.
+
+        Returns:
+            The name of the first accelerated variant (see `_suffixes`)
+            that the engine knows, or the plain style.
+        """
+        for suffix in self._suffixes:
+            if self._engine.lmp.has_style(category, f"{style}/{suffix}"):
+                return f"{style}/{suffix}"
+        return style
 
     def _add_settings(self, atom_style: str = "atomic"):
         """Defines the general engine settings.
@@ -526,9 +1876,29 @@ class SimLAMMPS(Wrapper):
             atom_style: atom style.
         """
         self._engine.atom_style(atom_style)
+        if "omp" in self._suffixes:
+            self._engine.package("omp", self._threads)
         self._engine.atom_modify("map", "array")
-        self._engine.neighbor(0.3, "bin")
-        self._engine.neigh_modify("delay", 5)
+        self._set_neighbor()
+
+    def _set_neighbor(self, **settings):
+        """Applies the neighbor list settings to the engine.
+
+        Args:
+            settings: settings to change (see `NEIGHBOR`), the rest are
+                left as they are.
+        """
+        self._neighbor.update(settings)
+        neighbor = self._neighbor
+        self._engine.neighbor(neighbor["skin"], neighbor["style"])
+        keywords = []
+        for key in ("every", "delay", "check", "page", "one"):
+            value = neighbor[key]
+            if isinstance(value, bool):
+                value = "yes" if value else "no"
+            if value is not None:
+                keywords += [key, value]
+        self._engine.neigh_modify(*keywords)
 
     def _add_simulation_box(self, simulation_box: OntologyIndividual):
         """Adds the simulation box to the engine.
@@ -572,7 +1942,9 @@ class SimLAMMPS(Wrapper):
             lj: lennard-jones individual.
         """
         if lj:
-            self._engine.pair_style("lj/cut", float(lj.cutoffDistance))
+            self._engine.pair_style(
+                self._accelerated("pair", "lj/cut"), float(lj.cutoffDistance)
+            )
             self._engine.pair_coeff(
                 "*",
                 "*",
@@ -580,6 +1952,68 @@ class SimLAMMPS(Wrapper):
                 float(lj.vanDerWaalsRadius),
             )
 
+    def _fill_lattice(self, lattice: OntologyIndividual):
+        """Creates the atoms of a lattice on the engine.
+
+        The engine places the atoms on the sites of the lattice that lie
+        inside the simulation box, or inside the block that is part of the
+        lattice. The atoms are only registered on the atom mapper, waiting
+        to be materialized (see `_materialize`). Their identifiers are
+        derived from the identifier of the lattice, so that every MPI rank
+        gets the same ones.
+
+        Args:
+            lattice: the lattice individual, with a material as part.
+        """
+        style, sites = next(
+            value
+            for oclass, value in self.LATTICES.items()
+            if lattice.is_a(oclass)
+        )
+        material = lattice.get(oclass=simlammps.Material).one()
+        block = lattice.get(oclass=simlammps.Block).any()
+        lmp = self._engine.lmp
+        constant = float(lattice.latticeConstant)
+        if lmp.extract_global("units") == "lj":
+            self._engine.lattice(style, sites / constant**3)
+        else:
+            self._engine.lattice(style, constant)
+        namespace = uuid5(NAMESPACE_URL, str(lattice.identifier))
+        if block is None:
+            target = ("box",)
+        else:
+            name = f"lattice_{namespace.hex}"
+            lower, upper = block.lowerCorner.data, block.upperCorner.data
+            self._engine.region(
+                name,
+                "block",
+                *(x for bounds in zip(lower, upper) for x in bounds),
+                "units",
+                "box",
+            )
+            target = ("region", name)
+
+        # New atoms get the ids that follow the largest one.
+        ids = self._atom_mapper.ids()
+        start = int(ids.max(initial=-1)) + 1
+        natoms = lmp.get_natoms()
+        # Atom types start at 1
+        atom_type = self._material_mapper.get(material.identifier) + 1
+        self._engine.create_atoms(atom_type, *target)
+        # Regions and later commands must not be scaled by the lattice.
+        self._engine.lattice("none", 1.0)
+
+        ids = np.arange(start, start + lmp.get_natoms() - natoms)
+        # Lammps internal id = pylammps id + 1
+        self._atom_mapper.add_many(
+            (
+                URIRef(ENTITY_IRI_PREFIX + str(uuid5(namespace, f"atom {x}")))
+                for x in (ids + 1).tolist()
+            ),
+            ids=ids,
+        )
+        self._pending = np.union1d(self._pending, ids)
+
     def _define_fix(self, thermo: Optional[OntologyIndividual] = None):
         """Defines the fixes.
 
@@ -610,41 +2044,118 @@ class SimLAMMPS(Wrapper):
             atom_type = len(self._material_mapper)
         self._engine.mass(atom_type, float(mass.value))
 
-    @staticmethod
-    def _set_position(lammps_atom: Atom, position_vector: List[float]):
-        """Updates the position of an atom from LAMMPS.
+    def _scatter_atoms(self, name: str, ids: np.ndarray, values: np.ndarray):
+        """Sets a per-atom vector quantity of atoms in the engine.
 
         Args:
-            lammps_atom: atom in LAMMPS.
-            position_vector: new position values.
+            name: name of the per-atom quantity in LAMMPS (`x`, `v`).
+            ids: pylammps ids of the atoms.
+            values: array with one row per atom, following the ids.
         """
-        lammps_atom.position = position_vector
+        if not len(ids):
+            return
+        lmp = self._engine.lmp
+        # Lammps internal id = pylammps id + 1
+        tags = (lmp.c_tagint * len(ids))(*(np.asarray(ids) + 1).tolist())
+        values = np.ascontiguousarray(values, dtype=float).ravel()
+        lmp.scatter_atoms_subset(
+            name, 1, 3, len(ids), tags, np.ctypeslib.as_ctypes(values)
+        )
 
-    @staticmethod
-    def _set_velocity(lammps_atom: Atom, velocity_vector: List[float]):
-        """Updates the velocity of an atom from LAMMPS.
+    def _set_force(self, lammps_atom_id: int, force_vector: List[float]):
+        """Sets the force to the atom.
+
+        The force is imposed on the engine when `_apply_forces` is called.
 
         Args:
-            lammps_atom: atom in LAMMPS.
-            velocity_vector: new velocity values.
+            lammps_atom_id: id of the atom in lammps.
+            force_vector: vector with the force values.
         """
-        lammps_atom.velocity = velocity_vector
+        self._forces[lammps_atom_id] = np.asarray(force_vector, dtype=float)
 
-    def _set_force(self, lammps_atom_id: int, force_vector: List[float]):
-        """Sets the force to the atom.
+    def _unset_force(self, lammps_atom_id: int):
+        """Stops imposing a force on the atom.
+
+        The change reaches the engine when `_apply_forces` is called.
 
         Args:
             lammps_atom_id: id of the atom in lammps.
-            force_vector: vector with the force values.
         """
-        # FIXME: Individual forces set to atoms should be made persistent
-        # Add the atom to a temporal group
-        self._engine.group("temp", "id", "==", lammps_atom_id)
+        self._forces[lammps_atom_id] = None
+
+    def _define_forces_fix(self):
+        """Defines the fix that imposes the forces (see `_apply_forces`).
+
+        The per-atom properties are read from the restart file when the
+        engine was restarted.
+        """
         self._engine.fix(
-            "fAtom" + str(lammps_atom_id), "temp", "setforce", *force_vector
+            "forces_values",
+            "all",
+            "property/atom",
+            *self.FORCE_PROPERTIES,
+            self.FORCED_PROPERTY,
         )
-        # Delete the group
-        # self._engine.group("temp", "delete")
+        for name, component in zip(("fx", "fy", "fz"), self.FORCE_PROPERTIES):
+            self._engine.variable(name, "atom", component)
+        self._engine.variable("forced", "atom", self.FORCED_PROPERTY)
+        self._engine.group("forced", "empty")
+        self._engine.fix(
+            "forces", "forced", "setforce", "v_fx", "v_fy", "v_fz"
+        )
+        self._forces_fix = True
+
+    def _apply_forces(self):
+        """Imposes the forces set since the last call on the engine.
+
+        All the forces are imposed by a single `setforce` fix on the
+        `forced` group. Its values are atom-style variables backed by
+        per-atom properties, which are written at once for all the atoms
+        whose force changed. The group is then rebuilt from a per-atom
+        flag, so that the number of fixes and commands does not depend on
+        the number of atoms with a force.
+        """
+        # Skip atoms that are no longer on the engine.
+        # Lammps internal id = pylammps id + 1
+        forces = {
+            lammps_atom_id: force
+            for lammps_atom_id, force in self._forces.items()
+            if lammps_atom_id - 1 in self._atom_mapper
+        }
+        self._forces.clear()
+        if not forces or (
+            not self._forces_fix and all(x is None for x in forces.values())
+        ):
+            return
+
+        if not self._forces_fix:
+            self._define_forces_fix()
+
+        lmp = self._engine.lmp
+        number = len(forces)
+        tags = (lmp.c_tagint * number)(*forces)
+        forced = np.array([x is not None for x in forces.values()])
+        values = np.zeros((number, 3))
+        values[forced] = [x for x in forces.values() if x is not None]
+        for i, component in enumerate(self.FORCE_PROPERTIES):
+            lmp.scatter_atoms_subset(
+                component,
+                1,
+                1,
+                number,
+                tags,
+                np.ctypeslib.as_ctypes(np.ascontiguousarray(values[:, i])),
+            )
+        lmp.scatter_atoms_subset(
+            self.FORCED_PROPERTY,
+            0,
+            1,
+            number,
+            tags,
+            np.ctypeslib.as_ctypes(forced.astype(np.intc)),
+        )
+        self._engine.group("forced", "clear")
+        self._engine.group("forced", "variable", "forced")
 
     def _update_simulation_box(self, simulation_box: OntologyIndividual):
         """Updates the simulation box.
@@ -682,20 +2193,44 @@ class SimLAMMPS(Wrapper):
             style_z,
         )
 
-    def _remove_atom(self, lammps_atom_id: int):
-        """Removes an atom from LAMMPS.
+    def _remove_atoms(self, atoms: List[OntologyIndividual]):
+        """Removes several atoms from LAMMPS at once.
+
+        Args:
+            atoms: atom individuals to remove.
+        """
+        self._delete_atoms(
+            self._atom_mapper.get_many(atom.identifier for atom in atoms)
+        )
+
+    def _delete_atoms(self, lammps_atom_ids: np.ndarray):
+        """Deletes atoms from LAMMPS and from the atom mapper.
 
         Args:
-            lammps_atom_id: id in LAMMPS of the atom to remove.
+            lammps_atom_ids: pylammps ids of the atoms. The ones that are
+                not on the engine are only removed from the mapper.
         """
-        # Add the atom to a temporal group
-        self._engine.group("temp", "id", "==", lammps_atom_id)
+        # Add the atoms to a temporal group, describing consecutive ids as
+        # ranges to keep the command short.
+        # Lammps internal id = pylammps id + 1
+        ids = np.unique(lammps_atom_ids + 1)
+        breaks = np.flatnonzero(np.diff(ids) != 1) + 1
+        starts = ids[np.concatenate(([0], breaks))]
+        ends = ids[np.concatenate((breaks - 1, [len(ids) - 1]))]
+        self._engine.group(
+            "temp",
+            "id",
+            *(
+                f"{start}:{end}" if start != end else f"{start}"
+                for start, end in zip(starts, ends)
+            ),
+        )
         # Remove the atoms from the group without re-assigning IDs
         self._engine.delete_atoms("group", "temp", "compress", "no")
         # Delete the group
         self._engine.group("temp", "delete")
-        # Update the mapper
-        self._atom_mapper.remove(lammps_atom_id)
+        # Update the mapper (pylammps id = Lammps internal id - 1)
+        self._atom_mapper.remove_many(ids - 1)
 
     def _map_material(self, material: OntologyIndividual):
         """Maps the uid of a material to a lammps atom type.
@@ -727,6 +2262,55 @@ class SimLAMMPS(Wrapper):
             return "p"
         return "f"
 
+    def _changed_atoms_and_parts(
+        self, buckets: Dict[str, Dict[OntologyClass, List[OntologyIndividual]]]
+    ) -> Tuple[Set[OntologyIndividual], Set[OntologyIndividual]]:
+        """Finds the atoms and parts affected by the changes of the user.
+
+        Args:
+            buckets: the changed individuals, as sorted for each operation
+                by `_bucket`.
+
+        Returns:
+            The added and updated atoms, positions, velocities and forces,
+            the atoms they belong to, the atoms that lost a part and the
+            parts that lost their atom, all from the new session.
+        """
+        part_classes = (
+            simlammps.Position,
+            simlammps.Velocity,
+            simlammps.Force,
+        )
+
+        def new(individual: OntologyIndividual) -> Set[OntologyIndividual]:
+            """Gets an individual from the new session, if still there."""
+            try:
+                return {self.session.from_identifier(individual.identifier)}
+            except KeyError:
+                return set()
+
+        atoms = set(buckets["add"][simlammps.Atom]) | set(
+            buckets["update"][simlammps.Atom]
+        )
+        parts = {
+            part
+            for operation in ("add", "update")
+            for oclass in part_classes
+            for part in buckets[operation][oclass]
+        }
+        atoms.update(filter(None, map(self._parent_atom, parts)))
+        # Deleted individuals belong to the old session.
+        for atom in buckets["remove"][simlammps.Atom]:
+            for oclass in part_classes:
+                for part in atom.get(oclass=oclass):
+                    parts |= new(part)
+        for oclass in part_classes:
+            for part in buckets["remove"][oclass]:
+                atom = self._parent_atom(part)
+                if atom is not None:
+                    atoms |= new(atom)
+        return atoms, parts
+
     @staticmethod
     def _parent_atom(
         individual: OntologyIndividual,
@@ -746,19 +2330,9 @@ class SimLAMMPS(Wrapper):
         ).inverse.any()
         return ontology_atom
 
-    def _lammps_atom(self, ontology_atom: OntologyIndividual) -> Atom:
-        """Gets the lammps atom corresponding to a given ontology atom.
-
-        Args:
-            ontology_atom: instance of an atom.
-
-        Returns:
-            lammps_atom: the atom in lammps
-        """
-        lammps_atom_id = self._atom_mapper.get(ontology_atom.identifier)
-        return self._engine.atoms[lammps_atom_id]
-
-    def _consistency_check(self) -> None:
+    def _consistency_check(
+        self, buckets: Dict[str, Dict[OntologyClass, List[OntologyIndividual]]]
+    ) -> None:
         """Consistency check.
 
         Before updating the data structures, check that the changes
@@ -767,10 +2341,41 @@ class SimLAMMPS(Wrapper):
         This necessary because SimPhoNy cannot revert the changes you
         make to your LAMMPS data structures.
 
+        Only the changed atoms, positions, velocities and forces and their
+        neighbours are checked, unless the wrapper is in strict mode.
+
+        Args:
+            buckets: the changed individuals, as sorted for each operation
+                by `_bucket`.
+
         Raises:
             AssertionError: When the data provided by the user would leave
                 LAMMPS in an inconsistent or unpredictable state.
+            ValueError: When an added observable or lattice is not of one
+                of the supported classes, or when a lattice is deleted.
         """
+        # Verify observables
+        for individual in buckets["add"][simlammps.Observable]:
+            if not any(individual.is_a(oclass) for oclass in self.OBSERVABLES):
+                raise ValueError(
+                    f"Unsupported observable {individual}, choose among "
+                    f"{', '.join(map(str, self.OBSERVABLES))}."
+                )
+
+        # Verify lattices: they fill the box once, their atoms stay.
+        for individual in buckets["add"][simlammps.Lattice]:
+            if not any(individual.is_a(oclass) for oclass in self.LATTICES):
+                raise ValueError(
+                    f"Unsupported lattice {individual}, choose among "
+                    f"{', '.join(map(str, self.LATTICES))}."
+                )
+        for individual in self.deleted:
+            if individual.is_a(simlammps.Lattice):
+                raise ValueError(
+                    f"Lattice {individual} cannot be deleted, delete its "
+                    f"atoms instead (see `materialize_atoms`)."
+                )
+
         try:
             # Verify simulation box
             simulation_box = self.session.get(
@@ -803,29 +2408,38 @@ class SimLAMMPS(Wrapper):
             for material in self.session.get(oclass=simlammps.Material):
                 assert len(material.get(oclass=simlammps.Mass)) == 1
 
+            # Verify lattices
+            for lattice in buckets["add"][simlammps.Lattice]:
+                assert len(lattice.get(oclass=simlammps.Material)) == 1
+                assert len(lattice.get(oclass=simlammps.Block)) <= 1
+
+            if self._strict:
+                atoms = set(self.session.get(oclass=simlammps.Atom))
+                parts = (
+                    set(self.session.get(oclass=simlammps.Velocity))
+                    | set(self.session.get(oclass=simlammps.Position))
+                    | set(self.session.get(oclass=simlammps.Force))
+                )
+            else:
+                atoms, parts = self._changed_atoms_and_parts(buckets)
+
             # Verify atoms
-            # - all atoms have at most one velocity, position and force. If
-            #   they are present, they have valid values.
-            for atom in self.session.get(oclass=simlammps.Atom):
-                assert 0 <= len(atom.get(oclass=simlammps.Velocity)) <= 1
-                assert 0 <= len(atom.get(oclass=simlammps.Position)) <= 1
-                assert 0 <= len(atom.get(oclass=simlammps.Force)) <= 1
-                velocity = atom.get(oclass=simlammps.Velocity).any()
-                position = atom.get(oclass=simlammps.Position).any()
-                force = atom.get(oclass=simlammps.Force).any()
-                for entity in filter(None, (velocity, position, force)):
-                    array = entity.vector.data
-                    assert array.dtype in ("int64", "float64")
-                    assert array.shape == (3,)
+            # - all atoms have at most one velocity, position and force.
+            vectors = []
+            for atom in atoms:
+                for oclass in (
+                    simlammps.Velocity,
+                    simlammps.Position,
+                    simlammps.Force,
+                ):
+                    entities = atom.get(oclass=oclass)
+                    assert len(entities) <= 1
+                    vectors.extend(entity.vector.data for entity in entities)
 
             # Verify positions, forces and velocities
             # - all positions, forces and velocities are attached to exactly
             # one atom.
-            for entity in (
-                set(self.session.get(oclass=simlammps.Velocity))
-                | set(self.session.get(oclass=simlammps.Position))
-                | set(self.session.get(oclass=simlammps.Force))
-            ):
+            for entity in parts:
                 assert (
                     len(
                         entity.get(
@@ -834,6 +2448,14 @@ class SimLAMMPS(Wrapper):
                     )
                     == 1
                 )
+                vectors.append(entity.vector.data)
+
+            # - all of them have valid values.
+            assert {array.shape for array in vectors} <= {(3,)}
+            assert {array.dtype for array in vectors} <= {
+                np.dtype("int64"),
+                np.dtype("float64"),
+            }
 
         except Exception as e:
             raise AssertionError(
@@ -841,3 +2463,296 @@ class SimLAMMPS(Wrapper):
                 "unpredictable state, cannot commit. Scroll up to find out "
                 "the detailed cause of the exception."
             ) from e
+
+
+def _interface(session: Session) -> SimLAMMPS:
+    """Gets the wrapper behind a SimLAMMPS session.
+
+    Args:
+        session: a SimLAMMPS session.
+
+    Raises:
+        TypeError: when the session is not a SimLAMMPS session.
+    """
+    interface = getattr(session.driver, "interface", None)
+    if not isinstance(interface, SimLAMMPS):
+        raise TypeError(f"{session} is not a SimLAMMPS session.")
+    return interface
+
+
+def subscribe(
+    session: Session,
+    quantities: Iterable[str] = tuple(SimLAMMPS.QUANTITIES),
+    atoms: Optional[Iterable[Union[OntologyIndividual, Identifier]]] = None,
+) -> None:
+    """Chooses the engine values written back to a SimLAMMPS session.
+
+    Values that are not subscribed stay on the engine and are never copied
+    to the session after a run.
+
+    Args:
+        session: a SimLAMMPS session.
+        quantities: per-atom quantities to write back (see
+            `SimLAMMPS.QUANTITIES`). Pass an empty iterable to write back
+            none.
+        atoms: atoms (or their identifiers) whose values are written back.
+            All atoms when not specified.
+
+    Raises:
+        TypeError: when the session is not a SimLAMMPS session.
+        ValueError: when one of the quantities is not supported.
+    """
+    interface = _interface(session)
+    interface._subscribe(quantities, atoms)
+
+
+def compute_async(
+    session: Session,
+    chunk_size: Optional[int] = None,
+    callback: Optional[Callable[[Snapshot], Optional[bool]]] = None,
+) -> Future:
+    """Runs the simulation of a SimLAMMPS session in the background.
+
+    The session is committed, and then its engine runs in a worker thread
+    owned by the session. LAMMPS releases the GIL while running, so the
+    simulations of several sessions can run at the same time. The worker
+    only runs the engine: calling `result` on the returned future waits
+    for the run and then updates the session as `session.compute()` would
+    do, on the calling thread.
+
+    The session cannot be committed until `result` is called. The output
+    of LAMMPS during the run is not captured, it is printed.
+
+    Args:
+        session: a SimLAMMPS session.
+        chunk_size: see `SimLAMMPS.compute`.
+        callback: see `SimLAMMPS.compute`, it is called from the worker
+            thread.
+
+    Returns:
+        A future that is done once the run finished. Its `result` updates
+        the session.
+
+    Raises:
+        TypeError: when the session is not a SimLAMMPS session.
+    """
+    interface = _interface(session)
+    return interface._submit(session, chunk_size, callback)
+
+
+def tune_neighbor(
+    session: Session,
+    skins: Iterable[float] = (0.1, 0.3, 0.5, 1.0),
+    delays: Iterable[int] = (0, 5, 10),
+    steps: int = 100,
+) -> Dict[str, Any]:
+    """Picks the neighbor list settings that run a system fastest.
+
+    The session is committed, and then the engine runs a short trial for
+    each combination of skin distance and delay. After each trial, the
+    positions, velocities and timestep of the atoms are restored, so the
+    simulation is not advanced. The settings with the most timesteps per
+    second are kept for the next runs. The settings cannot be tuned while
+    trajectories or videos are written.
+
+    Args:
+        session: a SimLAMMPS session.
+        skins: skin distances to try.
+        delays: delays between neighbor list rebuilds to try.
+        steps: steps of each trial run.
+
+    Returns:
+        The chosen neighbor list settings (see `SimLAMMPS.NEIGHBOR`).
+
+    Raises:
+        TypeError: when the session is not a SimLAMMPS session.
+        RuntimeError: when LAMMPS runs on several MPI ranks, tune the
+            settings on one rank and pass them to the `neighbor` argument
+            of the session instead. Also when the session has trajectories
+            or videos, tune the settings before adding them.
+        ValueError: when there are no settings to try.
+    """
+    interface = _interface(session)
+    session.commit()
+    return interface._tune_neighbor(skins, delays, steps)
+
+
+def save_checkpoint(session: Session, path: Union[str, Path]) -> None:
+    """Saves the state of a SimLAMMPS session to resume it later.
+
+    The session is committed, and then a directory is written with a
+    LAMMPS binary restart file, the ids of the atoms and materials on the
+    engine and the session itself. Pass the directory to the `checkpoint`
+    argument of a new session to resume the simulation.
+
+    Args:
+        session: a SimLAMMPS session.
+        path: directory to write to, it is created if needed.
+
+    Raises:
+        TypeError: when the session is not a SimLAMMPS session.
+    """
+    interface = _interface(session)
+    session.commit()
+    interface._save_checkpoint(Path(path))
+
+
+def materialize_atoms(
+    session: Session, count: Optional[int] = None
+) -> List[OntologyIndividual]:
+    """Adds atoms that are only on the engine to a SimLAMMPS session.
+
+    The atoms of a session started from a data file (see the `data_file`
+    argument of the session), the atoms added with `add_atoms` and the
+    atoms created by lattices (e.g. `simlammps.FaceCenteredCubic`) are on
+    the engine, but not on the session until they are materialized. Call
+    this function repeatedly to go through the atoms in pages. The
+    session is committed first.
+
+    Args:
+        session: a SimLAMMPS session.
+        count: maximum number of atoms to add. All of them when not
+            specified.
+
+    Returns:
+        The added atoms, in the order of their ids on the engine. Empty
+        once all the atoms were added.
+
+    Raises:
+        TypeError: when the session is not a SimLAMMPS session.
+    """
+    interface = _interface(session)
+    if count is None:
+        count = len(interface._pending)
+    session.commit()
+    return [session.from_identifier(x) for x in interface._materialize(count)]
+
+
+def time_series(
+    session: Session, observable: Union[OntologyIndividual, Identifier]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Gets the samples of an observable of a SimLAMMPS session.
+
+    Observables (e.g. `simlammps.Temperature`) are sampled at the end of
+    each run, and at the end of each chunk of chunked runs (see the
+    `chunk_size` argument of `compute`). Only the most recent samples are
+    kept (see the `history` argument of the session). To monitor a
+    simulation without writing the atoms back to the session, create the
+    session with `sync=()`.
+
+    Args:
+        session: a SimLAMMPS session.
+        observable: the observable (or its identifier).
+
+    Returns:
+        The timesteps and the values of the samples, oldest first.
+
+    Raises:
+        TypeError: when the session is not a SimLAMMPS session.
+        KeyError: when the observable is not committed to the session.
+    """
+    interface = _interface(session)
+    if isinstance(observable, OntologyIndividual):
+        observable = observable.identifier
+    _, series = interface._observables[observable]
+    return series.series()
+
+
+def atom_views(session: Session) -> AtomViews:
+    """Gets read-only views of the per-atom arrays of a SimLAMMPS engine.
+
+    The positions, velocities, forces and types of the atoms are not
+    copied, nor written to the session: the arrays wrap the memory of the
+    engine. Use them for analyses in the same process, and get new views
+    after each run or commit (see `AtomViews`). The session is not
+    committed.
+
+    Args:
+        session: a SimLAMMPS session.
+
+    Returns:
+        The views, and the identifiers of the atoms they belong to.
+
+    Raises:
+        TypeError: when the session is not a SimLAMMPS session.
+        RuntimeError: when the engine is running in the background.
+    """
+    interface = _interface(session)
+    if interface._running:
+        raise RuntimeError(
+            "The engine is running in the background, wait for the run to "
+            "finish before reading its arrays."
+        )
+    return interface._atom_views()
+
+
+def add_atoms(
+    session: Session,
+    material: OntologyIndividual,
+    positions: np.ndarray,
+    velocities: Optional[np.ndarray] = None,
+    forces: Optional[np.ndarray] = None,
+    identifiers: Optional[Iterable[Identifier]] = None,
+    materialize: bool = False,
+) -> np.ndarray:
+    """Adds many atoms of one material to a SimLAMMPS session at once.
+
+    The atoms are created on the engine straight from the arrays. They are
+    registered with an identifier, but they are only added to the session
+    when they are materialized (see `materialize_atoms`), or right away if
+    requested. Until then, they cost no graph operations, so this is the
+    way to set up systems of millions of atoms. The session is committed
+    first.
+
+    Args:
+        session: a SimLAMMPS session.
+        material: a material of the session.
+        positions: positions of the atoms (N x 3).
+        velocities: velocities of the atoms (N x 3). Zero when not
+            specified.
+        forces: forces to impose on the atoms (N x 3). None when not
+            specified.
+        identifiers: identifiers for the atoms. Random ones when not
+            specified, which differ between MPI ranks: give them when
+            running with MPI.
+        materialize: add the atoms to the session right away.
+
+    Returns:
+        The identifiers of the atoms, following the rows of the arrays.
+
+    Raises:
+        TypeError: when the session is not a SimLAMMPS session.
+        ValueError: when the shapes of the arrays do not match.
+        RuntimeError: when some atoms lie outside the simulation box.
+    """
+    interface = _interface(session)
+    positions = np.asarray(positions, dtype=float)
+    if positions.ndim != 2 or positions.shape[1] != 3:
+        raise ValueError("The positions must be an array of shape (N, 3).")
+    arrays = dict()
+    for name, array in (("velocities", velocities), ("forces", forces)):
+        if array is not None:
+            arrays[name] = np.asarray(array, dtype=float)
+            if arrays[name].shape != positions.shape:
+                raise ValueError(
+                    f"The {name} must be an array of shape {positions.shape}."
+                )
+    if identifiers is not None:
+        identifiers = list(identifiers)
+        if len(identifiers) != len(positions):
+            raise ValueError(
+                f"{len(positions)} identifiers are needed, got "
+                f"{len(identifiers)}."
+            )
+
+    session.commit()
+    ids = interface._add_atom_arrays(
+        material.identifier,
+        positions,
+        arrays.get("velocities"),
+        arrays.get("forces"),
+        identifiers,
+    )
+    if materialize:
+        interface._materialize(ids)
+    return interface._atom_mapper.get_many(ids)
@@ -0,0 +1,97 @@
+"""Test running ensembles of simulations."""
+
+import unittest
+
+import numpy as np
+from rdflib import URIRef
+from simphony_osp.namespaces import simlammps
+from simphony_osp.wrappers import SimLAMMPS
+
+from simphony_osp_simlammps.ensemble import run_ensemble
+from tests import test_simple
+
+
+class TestEnsemble(unittest.TestCase):
+    """Test running ensembles of simulations in worker processes."""
+
+    def test_run_ensemble(self):
+        """Tests running a simulation for each combination of values."""
+        template = test_simple.TestSimple.create_session()
+        mass = template.get(oclass=simlammps.Mass).one()
+        lj = template.get(oclass=simlammps.LennardJones612).one()
+        material = template.get(oclass=simlammps.Material).one()
+        with template:
+            # A second atom within the cutoff, so that the atoms interact.
+            other = simlammps.Atom()
+            other[simlammps.hasPart] += {
+                material,
+                simlammps.Position(vector=(2.2, 1, 1)),
+                simlammps.Velocity(vector=(0, 0, 0)),
+            }
+        grid = {
+            (mass, "value"): (0.2, 0.4),
+            (lj.identifier, "energyWellDepth"): (1.0, 2.0),
+        }
+
+        results = sorted(
+            run_ensemble(
+                template, grid, ("position", "velocity"), max_workers=2
+            )
+        )
+        self.assertEqual([result.index for result in results], [0, 1, 2, 3])
+        self.assertEqual(
+            results[1].parameters,
+            {
+                (mass.identifier, "value"): 0.2,
+                (lj.identifier, "energyWellDepth"): 2.0,
+            },
+        )
+        atoms = {
+            str(atom.identifier)
+            for atom in template.get(oclass=simlammps.Atom)
+        }
+        for result in results:
+            self.assertEqual(set(result.identifiers), atoms)
+
+        # Each simulation matches a session with the same parameters.
+        for result in results:
+            session = SimLAMMPS()
+            session.graph.parse(
+                data=template.graph.serialize(format="nt"), format="nt"
+            )
+            for (identifier, name), value in result.parameters.items():
+                setattr(session.from_identifier(identifier), name, value)
+            session.compute()
+            for identifier, position, velocity in zip(
+                result.identifiers,
+                result.values["position"],
+                result.values["velocity"],
+            ):
+                atom = session.from_identifier(URIRef(identifier))
+                np.testing.assert_allclose(
+                    position,
+                    atom.get(oclass=simlammps.Position).one().vector.data,
+                )
+                np.testing.assert_allclose(
+                    velocity,
+                    atom.get(oclass=simlammps.Velocity).one().vector.data,
+                )
+            session.close()
+
+        # The results depend on both parameters.
+        for i, j in ((0, 1), (0, 2)):
+            for quantity in ("position", "velocity"):
+                self.assertFalse(
+                    np.allclose(
+                        results[i].values[quantity],
+                        results[j].values[quantity],
+                    )
+                )
+
+        self.assertRaises(
+            ValueError, run_ensemble, template, grid, ("temperature",)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
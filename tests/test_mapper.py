@@ -1,9 +1,11 @@
 """Test the SimLAMMPS mapper utility."""
 
+import io
 import unittest
 import uuid
 
-from rdflib import URIRef
+import numpy as np
+from rdflib import BNode, URIRef
 
 from simphony_osp_simlammps.mapper import Mapper
 
@@ -16,8 +18,8 @@ class TestMapper(unittest.TestCase):
     def test_creation(self):
         """Tests the instantiation of the mapper."""
         maper = Mapper()
-        self.assertFalse(maper._to_ontology)
         self.assertFalse(maper._to_lammps)
+        self.assertEqual(len(maper), 0)
 
     def test_add(self):
         """Tests the standard, normal behaviour of the add() method."""
@@ -27,7 +29,8 @@ class TestMapper(unittest.TestCase):
         mapper.add(identifier)
 
         self.assertEqual(mapper._to_lammps, {identifier: 0})
-        self.assertEqual(mapper._to_ontology, {0: identifier})
+        self.assertEqual(list(mapper._identifiers[:1]), [identifier])
+        self.assertEqual(list(mapper._ids[:1]), [0])
 
     def test_add_throws_exception(self):
         """Tests the add() method for unusual behaviours.
@@ -76,13 +79,13 @@ class TestMapper(unittest.TestCase):
 
         # Remove by uid
         mapper.remove(identifier)
-        self.assertFalse(mapper._to_ontology)
+        self.assertEqual(len(mapper), 0)
         self.assertFalse(mapper._to_lammps)
 
         mapper.add(identifier)
         # Remove by lammps id
         mapper.remove(0)
-        self.assertFalse(mapper._to_ontology)
+        self.assertEqual(len(mapper), 0)
         self.assertFalse(mapper._to_lammps)
 
     def test_remove_throws_exception(self):
@@ -104,7 +107,113 @@ class TestMapper(unittest.TestCase):
 
     def test_contains(self):
         """Test the containment (x in Mapper)."""
-        pass
+        mapper = Mapper()
+        identifier = URIRef(IRI_PREFIX + str(uuid.uuid4()))
+        mapper.add(identifier)
+
+        self.assertIn(identifier, mapper)
+        self.assertIn(0, mapper)
+        self.assertNotIn(1, mapper)
+        self.assertNotIn(URIRef(IRI_PREFIX + str(uuid.uuid4())), mapper)
+
+    def test_ids_are_reused(self):
+        """Tests that removed ids are reused and never collide."""
+        mapper = Mapper()
+        identifiers = [URIRef(IRI_PREFIX + str(uuid.uuid4())) for _ in "abc"]
+        for identifier in identifiers:
+            mapper.add(identifier)
+
+        mapper.remove(identifiers[0])
+        new_identifier = URIRef(IRI_PREFIX + str(uuid.uuid4()))
+        self.assertEqual(mapper.add(new_identifier), 0)
+        another_identifier = URIRef(IRI_PREFIX + str(uuid.uuid4()))
+        self.assertEqual(mapper.add(another_identifier), 3)
+        self.assertEqual(mapper.get(1), identifiers[1])
+        self.assertEqual(mapper.get(2), identifiers[2])
+        self.assertEqual(len(mapper), 4)
+
+    def test_bulk_operations(self):
+        """Tests the add_many(), get_many() and remove_many() methods."""
+        mapper = Mapper()
+        identifiers = [
+            URIRef(IRI_PREFIX + str(uuid.uuid4())) for _ in range(10)
+        ]
+        ids = mapper.add_many(identifiers)
+        np.testing.assert_array_equal(ids, np.arange(10))
+        np.testing.assert_array_equal(
+            mapper.get_many(identifiers[::-1]), np.arange(10)[::-1]
+        )
+        self.assertEqual(list(mapper.get_many([3, 1])), identifiers[3:0:-2])
+
+        removed = mapper.remove_many(identifiers[2:5])
+        np.testing.assert_array_equal(removed, [2, 3, 4])
+        self.assertEqual(len(mapper), 7)
+        self.assertEqual(sorted(mapper.ids()), [0, 1, 5, 6, 7, 8, 9])
+        self.assertEqual(mapper.get(9), identifiers[9])
+
+        mapper.remove_many([0, 9])
+        new_ids = mapper.add_many(
+            URIRef(IRI_PREFIX + str(uuid.uuid4())) for _ in range(6)
+        )
+        np.testing.assert_array_equal(new_ids, [0, 2, 3, 4, 9, 10])
+
+        self.assertRaises(KeyError, mapper.get_many, [1, 11])
+        self.assertRaises(KeyError, mapper.remove_many, identifiers[2:3])
+        self.assertRaises(ValueError, mapper.add_many, identifiers[5:7])
+
+    def test_add_many_with_ids(self):
+        """Tests adding entries with the ids given by the engine."""
+        mapper = Mapper()
+        identifiers = [
+            URIRef(IRI_PREFIX + str(uuid.uuid4())) for _ in range(5)
+        ]
+        mapper.add_many(identifiers[:2])
+        mapper.remove(0)
+        ids = mapper.add_many(identifiers[2:4], ids=[4, 6])
+        np.testing.assert_array_equal(ids, [4, 6])
+        self.assertEqual(mapper.get(identifiers[3]), 6)
+        self.assertEqual(mapper.get(4), identifiers[2])
+        np.testing.assert_array_equal(mapper._free, [0, 2, 3, 5])
+        self.assertEqual(mapper.add(identifiers[4]), 0)
+        self.assertEqual(mapper._next, 7)
+
+        other = URIRef(IRI_PREFIX + str(uuid.uuid4()))
+        self.assertRaises(ValueError, mapper.add_many, [other], ids=[6])
+        self.assertRaises(ValueError, mapper.add_many, [other], ids=[1])
+        self.assertRaises(ValueError, mapper.add_many, [other], ids=[-1])
+        self.assertRaises(ValueError, mapper.add_many, [other], ids=[8, 9])
+        self.assertNotIn(other, mapper)
+
+    def test_save_load(self):
+        """Tests writing the mapper to a file and reading it back."""
+        mapper = Mapper()
+        identifiers = [
+            URIRef(IRI_PREFIX + str(uuid.uuid4())) for _ in range(5)
+        ] + [BNode()]
+        mapper.add_many(identifiers)
+        mapper.remove_many([1, 3])
+
+        file = io.BytesIO()
+        mapper.save(file)
+        file.seek(0)
+        loaded = Mapper.load(file)
+
+        self.assertEqual(len(loaded), 4)
+        self.assertEqual(loaded._to_lammps, mapper._to_lammps)
+        self.assertIsInstance(loaded.get(5), BNode)
+        self.assertIsInstance(loaded.get(0), URIRef)
+        self.assertNotIn(1, loaded)
+        new_identifiers = [
+            URIRef(IRI_PREFIX + str(uuid.uuid4())) for _ in range(3)
+        ]
+        np.testing.assert_array_equal(
+            loaded.add_many(new_identifiers), mapper.add_many(new_identifiers)
+        )
+
+        file = io.BytesIO()
+        Mapper().save(file)
+        file.seek(0)
+        self.assertEqual(len(Mapper.load(file)), 0)
 
 
 if __name__ == "__main__":
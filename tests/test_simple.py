@@ -1,11 +1,93 @@
 """Creates a simple run for testing the wrapper."""
 
+import json
+import os
+import shutil
+import subprocess
+import sys
 import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from threading import Event
+from typing import List
+from unittest.mock import patch
 
+import numpy as np
+from rdflib import URIRef
+from simphony_osp.development import get_hash
 from simphony_osp.namespaces import simlammps
+from simphony_osp.ontology import OntologyIndividual
 from simphony_osp.session import Session
 from simphony_osp.wrappers import SimLAMMPS
 
+from simphony_osp_simlammps import (
+    EnginePool,
+    LAMMPSTrajectory,
+    add_atoms,
+    atom_views,
+    compute_async,
+    materialize_atoms,
+    save_checkpoint,
+    subscribe,
+    time_series,
+    tune_neighbor,
+)
+
+DATA_FILE = """LAMMPS data file
+
+3 atoms
+1 atom types
+
+0.0 10.0 xlo xhi
+0.0 10.0 ylo yhi
+0.0 10.0 zlo zhi
+
+Masses
+
+1 0.2
+
+Pair Coeffs # lj/cut
+
+1 1.0 1.0
+
+Atoms # atomic
+
+7 1 1.0 1.0 1.0 0 0 0
+2 1 5.0 5.0 5.0 0 0 0
+4 1 3.0 6.0 9.0 0 0 0
+
+Velocities
+
+2 0.0 0.0 0.0
+7 1.0 0.0 1.0
+4 0.0 1.0 0.0
+"""
+"""Data file with the atom of `create_session` and two more, sparse ids."""
+
+MPI_SCRIPT = """
+import json
+import sys
+
+from simphony_osp.namespaces import simlammps
+from simphony_osp.wrappers import SimLAMMPS
+
+session = SimLAMMPS("-log none -screen none")
+session.graph.parse(sys.argv[1], format="nt")
+session.compute()
+engine = session.driver.interface._engine
+if engine.lmp.extract_setting("world_rank") == 0:
+    print(json.dumps({
+        "ranks": engine.lmp.extract_setting("world_size"),
+        "positions": {
+            atom.identifier: atom.get(oclass=simlammps.Position)
+            .one().vector.data.tolist()
+            for atom in session.get(oclass=simlammps.Atom)
+        },
+    }))
+session.close()
+"""
+"""Runs the simulation in a file on all ranks, prints the results on one."""
+
 
 class TestSimple(unittest.TestCase):
     """A test consisting on running a simple simulation."""
@@ -14,7 +96,16 @@ class TestSimple(unittest.TestCase):
 
     def setUp(self):
         """Configure the simulation inputs for the test."""
-        session = SimLAMMPS()
+        self.session = self.create_session()
+
+    @staticmethod
+    def create_session(**kwargs) -> Session:
+        """Create a session with the simulation inputs for the test.
+
+        Args:
+            kwargs: keyword arguments for the wrapper.
+        """
+        session = SimLAMMPS(**kwargs)
         session.locked = True
 
         with session:
@@ -61,19 +152,932 @@ class TestSimple(unittest.TestCase):
             velocity = simlammps.Velocity(vector=(1, 0, 1))
             particle[simlammps.hasPart] += {material, position, velocity}
         session.commit()
-
-        self.session = session
+        return session
 
     def test_simple_run(self):
         """Tests a simple run."""
         self.session.compute()
 
+    def test_chunked_run(self):
+        """Tests running the simulation in chunks."""
+        other_session = self.create_session()
+        other_session.compute()
+
+        snapshots = []
+        self.session.compute(
+            chunk_size=30,
+            callback=lambda x: snapshots.append(
+                (x.step, x.steps_done, x.steps, x.get("position"))
+            ),
+        )
+        self.assertEqual(
+            [snapshot[:3] for snapshot in snapshots],
+            [(30, 30, 100), (60, 60, 100), (90, 90, 100), (100, 100, 100)],
+        )
+        atom = self.session.get(oclass=simlammps.Atom).one()
+        position = atom.get(oclass=simlammps.Position).one().vector.data
+        np.testing.assert_array_equal(snapshots[-1][3], [position])
+        other_atom = other_session.get(oclass=simlammps.Atom).one()
+        np.testing.assert_allclose(
+            position,
+            other_atom.get(oclass=simlammps.Position).one().vector.data,
+        )
+
+        # Stop early.
+        interface = self.session.driver.interface
+        self.session.compute(chunk_size=30, callback=lambda x: True)
+        self.assertEqual(
+            interface._engine.lmp.extract_global("ntimestep"), 130
+        )
+
+    def test_compute_async(self):
+        """Tests running several simulations in the background."""
+        reference = self.create_session()
+        reference.compute()
+        reference_atom = reference.get(oclass=simlammps.Atom).one()
+        other_session = self.create_session()
+
+        event = Event()
+
+        def wait(snapshot):
+            """Keep the run going until the event is set."""
+            event.wait()
+
+        futures = [
+            compute_async(self.session, chunk_size=50, callback=wait),
+            compute_async(other_session),
+        ]
+        self.assertRaises(RuntimeError, self.session.commit)
+        event.set()
+        futures[0].exception()
+        # The session is only updated when the result is collected.
+        self.assertRaises(RuntimeError, self.session.commit)
+        for session, future in zip((self.session, other_session), futures):
+            future.result()
+            atom = session.get(oclass=simlammps.Atom).one()
+            np.testing.assert_allclose(
+                atom.get(oclass=simlammps.Position).one().vector.data,
+                reference_atom.get(oclass=simlammps.Position)
+                .one()
+                .vector.data,
+            )
+        self.session.commit()
+        self.assertRaises(TypeError, compute_async, Session())
+
+    def test_compute_async_sessions(self):
+        """Tests several sessions running in the background at once."""
+        reference = self.create_session()
+        for _ in range(3):
+            reference.compute()
+        reference_atom = reference.get(oclass=simlammps.Atom).one()
+        sessions = [self.create_session() for _ in range(6)]
+        stdout = os.fstat(1)
+        for _ in range(3):
+            futures = [
+                compute_async(session, chunk_size=1) for session in sessions
+            ]
+            for future in futures:
+                future.result()
+        self.assertEqual(
+            (stdout.st_dev, stdout.st_ino),
+            (os.fstat(1).st_dev, os.fstat(1).st_ino),
+        )
+        for session in sessions:
+            session.commit()
+            atom = session.get(oclass=simlammps.Atom).one()
+            np.testing.assert_allclose(
+                atom.get(oclass=simlammps.Position).one().vector.data,
+                reference_atom.get(oclass=simlammps.Position)
+                .one()
+                .vector.data,
+            )
+
     def test_without_velocity(self):
         """Tests a simple run where the atom has no velocity."""
         atom = self.session.get(oclass=simlammps.Atom).one()
         self.session.delete(atom.get(oclass=simlammps.Velocity))
         self.session.compute()
 
+    def test_update_atoms(self):
+        """Tests that changes to the atoms reach the engine."""
+        interface = self.session.driver.interface
+        atom = self.session.get(oclass=simlammps.Atom).one()
+        lammps_atom_id = interface._atom_mapper.get(atom.identifier)
+        velocity = atom.get(oclass=simlammps.Velocity).one()
+
+        velocity.vector = (0, 2, 0)
+        atom.get(oclass=simlammps.Position).one().vector = (4, 4, 4)
+        self.session.commit()
+        np.testing.assert_array_equal(
+            interface._gather_atoms("v")[lammps_atom_id], (0, 2, 0)
+        )
+        np.testing.assert_array_equal(
+            interface._gather_atoms("x")[lammps_atom_id], (4, 4, 4)
+        )
+
+        self.session.delete(velocity)
+        self.session.commit()
+        np.testing.assert_array_equal(
+            interface._gather_atoms("v")[lammps_atom_id], (0, 0, 0)
+        )
+
+        with self.session:
+            atom[simlammps.hasPart] += simlammps.Velocity(vector=(3, 0, 0))
+        self.session.commit()
+        np.testing.assert_array_equal(
+            interface._gather_atoms("v")[lammps_atom_id], (3, 0, 0)
+        )
+
+    def test_consistency_check(self):
+        """Tests that inconsistent changes are not committed."""
+        atom = self.session.get(oclass=simlammps.Atom).one()
+        with self.session:
+            atom[simlammps.hasPart] += simlammps.Position(vector=(2, 2, 2))
+        self.assertRaises(AssertionError, self.session.commit)
+
+        for strict in (False, True):
+            self.session = self.create_session(strict=strict)
+            atom = self.session.get(oclass=simlammps.Atom).one()
+            # The position would be left without an atom.
+            self.session.delete(atom)
+            self.assertRaises(AssertionError, self.session.commit)
+
+    def test_compute_updates_atoms(self):
+        """Tests that the engine values are written back to the atoms."""
+        self.session.compute()
+        interface = self.session.driver.interface
+        atom = self.session.get(oclass=simlammps.Atom).one()
+        lammps_atom_id = interface._atom_mapper.get(atom.identifier)
+        for oclass, name in (
+            (simlammps.Position, "x"),
+            (simlammps.Velocity, "v"),
+        ):
+            vector = atom.get(oclass=oclass).one().vector
+            np.testing.assert_allclose(
+                vector.data, interface._gather_atoms(name)[lammps_atom_id]
+            )
+        self.assertFalse(atom.get(oclass=simlammps.Force))
+
+    def test_subscribe(self):
+        """Tests writing back only the subscribed quantities and atoms."""
+        atom = self.session.get(oclass=simlammps.Atom).one()
+        material = self.session.get(oclass=simlammps.Material).one()
+        with self.session:
+            other_atom = simlammps.Atom()
+            position = simlammps.Position(vector=(2, 1, 1))
+            other_atom[simlammps.hasPart] += {material, position}
+        self.session.commit()
+        interface = self.session.driver.interface
+
+        subscribe(self.session, ["position"], atoms=[atom])
+        self.session.compute()
+        lammps_atom_id = interface._atom_mapper.get(atom.identifier)
+        np.testing.assert_allclose(
+            atom.get(oclass=simlammps.Position).one().vector.data,
+            interface._gather_atoms("x")[lammps_atom_id],
+        )
+        np.testing.assert_array_equal(
+            atom.get(oclass=simlammps.Velocity).one().vector.data, (1, 0, 1)
+        )
+        np.testing.assert_array_equal(
+            other_atom.get(oclass=simlammps.Position).one().vector.data,
+            (2, 1, 1),
+        )
+        self.assertFalse(other_atom.get(oclass=simlammps.Velocity))
+        self.assertRaises(ValueError, subscribe, self.session, ["temperature"])
+
+    def test_lazy(self):
+        """Tests fetching the engine values when they are read."""
+        for hook in ("triples", "remove", "query", "update"):
+            self.assertFalse(hasattr(self.session.driver.interface, hook))
+        self.session = self.create_session(lazy=True)
+        self.session.compute()
+        interface = self.session.driver.interface
+        atom = self.session.get(oclass=simlammps.Atom).one()
+        position = atom.get(oclass=simlammps.Position).one()
+        lammps_atom_id = interface._atom_mapper.get(atom.identifier)
+
+        # The outdated value stays on the base graph.
+        stored = interface.base.value(
+            position.identifier, simlammps.vector.iri
+        )
+        np.testing.assert_array_equal(stored.toPython().data, (1, 1, 1))
+        engine_position = interface._gather_atoms("x")[lammps_atom_id]
+        np.testing.assert_allclose(position.vector.data, engine_position)
+        self.assertIn(position.identifier, interface._live)
+        velocity = atom.get(oclass=simlammps.Velocity).one()
+        stored = interface.base.value(
+            velocity.identifier, simlammps.vector.iri
+        )
+        np.testing.assert_array_equal(stored.toPython().data, (1, 0, 1))
+        np.testing.assert_allclose(
+            velocity.vector.data,
+            interface._gather_atoms("v")[lammps_atom_id],
+        )
+
+        position.vector = (3, 3, 3)
+        np.testing.assert_array_equal(position.vector.data, (3, 3, 3))
+        self.session.commit()
+        np.testing.assert_array_equal(position.vector.data, (3, 3, 3))
+        np.testing.assert_array_equal(
+            interface._gather_atoms("x")[lammps_atom_id], (3, 3, 3)
+        )
+
+        self.session.compute()
+        np.testing.assert_allclose(
+            position.vector.data,
+            interface._gather_atoms("x")[lammps_atom_id],
+        )
+
+    def test_forces(self):
+        """Tests imposing forces on atoms with a single fix."""
+        atom = self.session.get(oclass=simlammps.Atom).one()
+        material = self.session.get(oclass=simlammps.Material).one()
+        with self.session:
+            atom[simlammps.hasPart] += simlammps.Force(vector=(0, 0, 1))
+            other_atom = simlammps.Atom()
+            position = simlammps.Position(vector=(5, 5, 5))
+            force = simlammps.Force(vector=(1, 0, 0))
+            other_atom[simlammps.hasPart] += {material, position, force}
+        self.session.commit()
+        interface = self.session.driver.interface
+        fixes = [fix["style"] for fix in interface._engine.fixes]
+        self.assertEqual(fixes.count("setforce"), 1)
+
+        self.session.compute()
+        np.testing.assert_array_equal(
+            atom.get(oclass=simlammps.Force).one().vector.data, (0, 0, 1)
+        )
+        np.testing.assert_array_equal(force.vector.data, (1, 0, 0))
+
+        self.session.delete(atom.get(oclass=simlammps.Force).one())
+        force.vector = (0, 2, 0)
+        self.session.compute()
+        self.assertFalse(atom.get(oclass=simlammps.Force))
+        np.testing.assert_array_equal(force.vector.data, (0, 2, 0))
+
+    @staticmethod
+    def add_atom_grid(session: Session) -> List[OntologyIndividual]:
+        """Add a 3x3x3 grid of atoms to a session and commit it.
+
+        Args:
+            session: session created by `create_session`.
+
+        Returns:
+            The new atoms.
+        """
+        material = session.get(oclass=simlammps.Material).one()
+        atoms = []
+        with session:
+            for i in range(27):
+                particle = simlammps.Atom()
+                position = simlammps.Position(
+                    vector=(2 + i % 3 * 2, 2 + i // 3 % 3 * 2, 2 + i // 9 * 2)
+                )
+                particle[simlammps.hasPart] += {material, position}
+                atoms.append(particle)
+        session.commit()
+        return atoms
+
+    def test_add_many_atoms(self):
+        """Tests that atoms added at once get consistent ids and values."""
+        self.add_atom_grid(self.session)
+
+        interface = self.session.driver.interface
+        self.assertEqual(interface._engine.lmp.get_natoms(), 28)
+        positions = interface._gather_atoms("x")
+        for atom in self.session.get(oclass=simlammps.Atom):
+            lammps_atom_id = interface._atom_mapper.get(atom.identifier)
+            np.testing.assert_allclose(
+                atom.get(oclass=simlammps.Position).one().vector.data,
+                positions[lammps_atom_id],
+            )
+
+    def test_delete_many_atoms(self):
+        """Tests that atoms deleted at once are removed from the engine."""
+        self.test_add_many_atoms()
+        interface = self.session.driver.interface
+        atoms = sorted(
+            self.session.get(oclass=simlammps.Atom),
+            key=lambda x: interface._atom_mapper.get(x.identifier),
+        )
+        # Consecutive and isolated ids.
+        deleted = atoms[3:9] + atoms[12:13] + atoms[20:23]
+        self.session.delete(
+            deleted + [x.get(oclass=simlammps.Position).one() for x in deleted]
+        )
+        self.session.commit()
+
+        self.assertEqual(interface._engine.lmp.get_natoms(), 18)
+        self.assertEqual(len(interface._atom_mapper), 18)
+        positions = interface._gather_atoms("x")
+        for atom in self.session.get(oclass=simlammps.Atom):
+            lammps_atom_id = interface._atom_mapper.get(atom.identifier)
+            np.testing.assert_allclose(
+                atom.get(oclass=simlammps.Position).one().vector.data,
+                positions[lammps_atom_id],
+            )
+        self.session.compute()
+
+    def test_configuration(self):
+        """Tests passing command-line arguments to LAMMPS."""
+        session = self.create_session(configuration_string="-sf omp -pk omp 2")
+        atoms = self.add_atom_grid(session)
+        expected = self.add_atom_grid(self.session)
+        session.compute()
+        self.session.compute()
+
+        self.assertEqual(
+            session.driver.interface._engine.system.pair_style, "lj/cut/omp"
+        )
+        np.testing.assert_allclose(
+            [
+                x.get(oclass=simlammps.Position).one().vector.data
+                for x in atoms
+            ],
+            [
+                x.get(oclass=simlammps.Position).one().vector.data
+                for x in expected
+            ],
+        )
+        session.close()
+
+    def test_accelerated_pair_style(self):
+        """Tests using the accelerated variants of the pair style."""
+        sessions = {
+            "lj/cut": self.create_session(accelerate=False),
+            "lj/cut/opt": self.session,
+            "lj/cut/omp": self.create_session(threads=2),
+        }
+        positions = dict()
+        for style, session in sessions.items():
+            atoms = self.add_atom_grid(session)
+            session.compute()
+            self.assertEqual(
+                session.driver.interface._engine.system.pair_style, style
+            )
+            positions[style] = [
+                atom.get(oclass=simlammps.Position).one().vector.data
+                for atom in atoms
+            ]
+        np.testing.assert_allclose(
+            positions["lj/cut/opt"], positions["lj/cut"], rtol=1e-6
+        )
+        np.testing.assert_allclose(
+            positions["lj/cut/omp"], positions["lj/cut"], rtol=1e-6
+        )
+        sessions["lj/cut"].close()
+        sessions["lj/cut/omp"].close()
+
+    def test_neighbor(self):
+        """Tests changing the neighbor list settings."""
+        self.assertRaises(ValueError, SimLAMMPS, neighbor={"cutoff": 1.0})
+        session = self.create_session(
+            neighbor={"skin": 0.5, "every": 2, "delay": 4, "check": False}
+        )
+        atoms = self.add_atom_grid(session)
+        expected = self.add_atom_grid(self.session)
+        session.compute()
+        self.session.compute()
+
+        np.testing.assert_allclose(
+            [
+                x.get(oclass=simlammps.Position).one().vector.data
+                for x in atoms
+            ],
+            [
+                x.get(oclass=simlammps.Position).one().vector.data
+                for x in expected
+            ],
+        )
+        session.close()
+
+    def test_tune_neighbor(self):
+        """Tests choosing the neighbor list settings that run fastest."""
+        session = self.create_session()
+        atoms = self.add_atom_grid(session)
+        expected = self.add_atom_grid(self.session)
+
+        settings = tune_neighbor(session, skins=(0.3, 0.6), delays=(0, 10))
+        self.assertIn(settings["skin"], (0.3, 0.6))
+        self.assertIn(settings["delay"], (0, 10))
+        self.assertEqual(settings["every"], 1)
+        engine = session.driver.interface._engine
+        self.assertEqual(engine.lmp.extract_global("ntimestep"), 0)
+
+        # The trials do not advance the simulation.
+        session.compute()
+        self.session.compute()
+        np.testing.assert_allclose(
+            [
+                x.get(oclass=simlammps.Position).one().vector.data
+                for x in atoms
+            ],
+            [
+                x.get(oclass=simlammps.Position).one().vector.data
+                for x in expected
+            ],
+        )
+        self.assertRaises(ValueError, tune_neighbor, session, skins=())
+
+        # Trajectories cannot be written while tuning.
+        neighbor = dict(session.driver.interface._neighbor)
+        with session:
+            simlammps.Trajectory(steps=50)
+        self.assertRaises(RuntimeError, tune_neighbor, session)
+        self.assertEqual(session.driver.interface._neighbor, neighbor)
+        self.assertEqual(engine.lmp.extract_global("ntimestep"), 100)
+        session.compute()
+        self.assertEqual(engine.lmp.extract_global("ntimestep"), 200)
+        session.close()
+
+    def test_engine_pool(self):
+        """Tests reusing the engines of closed sessions."""
+        pool = EnginePool(max_size=1)
+        session = self.create_session(pool=pool)
+        session.compute()
+        engine = session.driver.interface._engine
+        session.close()
+        self.assertEqual(len(pool), 1)
+
+        # The engine is reset before it is reused.
+        session = self.create_session(pool=pool)
+        self.assertIs(session.driver.interface._engine, engine)
+        self.assertEqual(len(pool), 0)
+        self.assertEqual(engine.runs, [])
+        session.compute()
+        self.assertEqual(engine.lmp.extract_global("ntimestep"), 100)
+        atom = session.get(oclass=simlammps.Atom).one()
+        np.testing.assert_allclose(
+            atom.get(oclass=simlammps.Position).one().vector.data,
+            (1.5, 1, 1.5),
+        )
+
+        # Engines with other command-line arguments are not reused.
+        other_session = self.create_session(
+            configuration_string="-sf omp", pool=pool
+        )
+        self.assertIsNot(other_session.driver.interface._engine, engine)
+        session.close()
+        other_session.close()
+        self.assertEqual(len(pool), 1)
+
+        # Idle engines are evicted.
+        pool.max_idle = 0
+        session = self.create_session(pool=pool)
+        self.assertEqual(len(pool), 0)
+        session.close()
+        pool.clear()
+        self.assertEqual(len(pool), 0)
+
+    def test_checkpoint(self):
+        """Tests resuming a simulation from a checkpoint."""
+        session = self.create_session(lazy=True)
+        atoms = self.add_atom_grid(session)
+        with session:
+            atoms[0][simlammps.hasPart] += simlammps.Force(vector=(0.1, 0, 0))
+        session.compute()
+        with TemporaryDirectory() as directory:
+            save_checkpoint(session, directory)
+            resumed = SimLAMMPS(checkpoint=directory)
+
+        interface = resumed.driver.interface
+        self.assertEqual(len(interface._atom_mapper), 28)
+        self.assertEqual(
+            interface._engine.lmp.extract_global("ntimestep"), 100
+        )
+        for atom in atoms:
+            np.testing.assert_array_equal(
+                resumed.from_identifier(atom.identifier)
+                .get(oclass=simlammps.Position)
+                .one()
+                .vector.data,
+                atom.get(oclass=simlammps.Position).one().vector.data,
+            )
+
+        # The resumed simulation continues as the original one.
+        session.compute()
+        resumed.compute()
+        self.assertEqual(
+            interface._engine.lmp.extract_global("ntimestep"), 200
+        )
+        fixes = [fix["style"] for fix in interface._engine.fixes]
+        self.assertEqual(fixes.count("setforce"), 1)
+        for atom in atoms:
+            np.testing.assert_allclose(
+                resumed.from_identifier(atom.identifier)
+                .get(oclass=simlammps.Position)
+                .one()
+                .vector.data,
+                atom.get(oclass=simlammps.Position).one().vector.data,
+            )
+        resumed.close()
+        session.close()
+
+    def test_data_file(self):
+        """Tests starting a simulation from a data file."""
+        with TemporaryDirectory() as directory:
+            path = Path(directory) / "data.lammps"
+            path.write_text(DATA_FILE)
+            session = SimLAMMPS(data_file=path)
+        session.locked = True
+        interface = session.driver.interface
+        self.assertEqual(interface._engine.lmp.get_natoms(), 3)
+        self.assertEqual(len(interface._atom_mapper), 3)
+        self.assertFalse(session.get(oclass=simlammps.Atom))
+        box = session.get(oclass=simlammps.SimulationBox).one()
+        face_y = box.get(oclass=simlammps.FaceY).one()
+        np.testing.assert_array_equal(face_y.vector.data, (0, 10, 0))
+        self.assertTrue(face_y.get(oclass=simlammps.Periodic))
+        material = session.get(oclass=simlammps.Material).one()
+        self.assertEqual(
+            float(material.get(oclass=simlammps.Mass).one().value), 0.2
+        )
+
+        # The rest of the simulation inputs come from the session.
+        template = self.create_session()
+        with session:
+            lj = template.get(oclass=simlammps.LennardJones612).one()
+            lj = simlammps.LennardJones612(
+                cutoffDistance=lj.cutoffDistance,
+                energyWellDepth=lj.energyWellDepth,
+                vanDerWaalsRadius=lj.vanDerWaalsRadius,
+            )
+            lj[simlammps.hasPart] += material
+            simlammps.MolecularDynamics()
+            solver_parameter = simlammps.SolverParameter()
+            solver_parameter[simlammps.hasPart] += {
+                simlammps.IntegrationTime(steps=100),
+                simlammps.Verlet(),
+            }
+
+        atoms = materialize_atoms(session, 2)
+        self.assertEqual(len(atoms), 2)
+        self.assertEqual(set(session.get(oclass=simlammps.Atom)), set(atoms))
+        self.assertEqual(len(interface._pending), 1)
+        positions = interface._gather_atoms("x")
+        for atom in atoms:
+            lammps_atom_id = interface._atom_mapper.get(atom.identifier)
+            np.testing.assert_array_equal(
+                atom.get(oclass=simlammps.Position).one().vector.data,
+                positions[lammps_atom_id],
+            )
+        resting = [
+            atom for atom in atoms if not atom.get(oclass=simlammps.Velocity)
+        ]
+        self.assertEqual(len(resting), 1)
+
+        session.compute()
+        atoms += materialize_atoms(session)
+        self.assertEqual(len(atoms), 3)
+        self.assertEqual(materialize_atoms(session), [])
+        positions = interface._gather_atoms("x")
+        for atom in atoms:
+            lammps_atom_id = interface._atom_mapper.get(atom.identifier)
+            np.testing.assert_allclose(
+                atom.get(oclass=simlammps.Position).one().vector.data,
+                positions[lammps_atom_id],
+            )
+        # The atom of `create_session` moved as in `test_simple_run`.
+        self.assertTrue(
+            any(
+                np.allclose(
+                    x.get(oclass=simlammps.Position).one().vector.data,
+                    (1.5, 1, 1.5),
+                )
+                for x in atoms
+            )
+        )
+        session.close()
+
+    def test_data_file_origin(self):
+        """Tests moving the box of a data file to the origin."""
+        data = DATA_FILE.replace("0.0 10.0 xlo", "-2.0 8.0 xlo").replace(
+            "0.0 10.0 zlo", "0.5 10.5 zlo"
+        )
+        with TemporaryDirectory() as directory:
+            path = Path(directory) / "data.lammps"
+            path.write_text(data)
+            session = SimLAMMPS(data_file=path)
+        session.locked = True
+        interface = session.driver.interface
+        boxlo, boxhi, *_ = interface._engine.lmp.extract_box()
+        np.testing.assert_array_equal(boxlo, (0, 0, 0))
+        np.testing.assert_array_equal(boxhi, (10, 10, 10))
+        box = session.get(oclass=simlammps.SimulationBox).one()
+        face_x = box.get(oclass=simlammps.FaceX).one()
+        np.testing.assert_array_equal(face_x.vector.data, (10, 0, 0))
+
+        # Materializing pages does not gather the values of other atoms.
+        with patch.object(
+            interface, "_update_atoms_from_backend", side_effect=RuntimeError
+        ):
+            atoms = materialize_atoms(session, 2) + materialize_atoms(session)
+        positions = sorted(
+            atom.get(oclass=simlammps.Position).one().vector.data.tolist()
+            for atom in atoms
+        )
+        np.testing.assert_allclose(
+            positions, [(3, 1, 0.5), (5, 6, 8.5), (7, 5, 4.5)]
+        )
+        session.close()
+
+    def test_trajectory(self):
+        """Tests writing trajectories while the simulation runs."""
+        atoms = self.add_atom_grid(self.session)
+        with self.session:
+            binary = simlammps.Trajectory(steps=50)
+            compressed = simlammps.Trajectory(
+                steps=25, columns="id vx vy vz", compressed=True
+            )
+        self.session.compute()
+
+        interface = self.session.driver.interface
+        ids = interface._atom_mapper.get_many(
+            [atom.identifier for atom in atoms]
+        )
+        with binary.operations.handle as file:
+            frames = list(LAMMPSTrajectory(file))
+        self.assertEqual([frame.step for frame in frames], [0, 50, 100])
+        np.testing.assert_array_equal(frames[0].box, [(0, 10)] * 3)
+        self.assertEqual(
+            frames[0].atoms.dtype.names, ("id", "type", "x", "y", "z")
+        )
+        np.testing.assert_array_equal(frames[-1].atoms["id"], np.arange(1, 29))
+        self.assertFalse(frames[-1].atoms.flags.writeable)
+        for atom, lammps_atom_id in zip(atoms, ids):
+            np.testing.assert_allclose(
+                [frames[-1].atoms[lammps_atom_id][x] for x in "xyz"],
+                atom.get(oclass=simlammps.Position).one().vector.data,
+            )
+
+        with compressed.operations.handle as file:
+            frames = list(LAMMPSTrajectory(file))
+        self.assertEqual(len(frames), 5)
+        for atom, lammps_atom_id in zip(atoms, ids):
+            np.testing.assert_allclose(
+                [
+                    frames[-1].atoms[lammps_atom_id][x]
+                    for x in ("vx", "vy", "vz")
+                ],
+                atom.get(oclass=simlammps.Velocity).one().vector.data,
+            )
+        with TemporaryDirectory() as directory:
+            path = Path(directory) / "trajectory.bin"
+            binary.operations.download(path)
+            self.assertEqual(
+                interface.hash(binary.identifier), get_hash(str(path))
+            )
+            self.assertEqual(len(list(LAMMPSTrajectory(path))), 3)
+
+    def test_observables(self):
+        """Tests sampling observables without writing atoms back."""
+        session = self.create_session(sync=(), history=3)
+        atoms = self.add_atom_grid(session)
+        with session:
+            observables = [
+                simlammps.Temperature(),
+                simlammps.Pressure(),
+                simlammps.PotentialEnergy(),
+                simlammps.KineticEnergy(),
+                simlammps.TotalEnergy(),
+            ]
+        temperature, pressure, pe, ke, etotal = observables
+        session.compute(chunk_size=20)
+
+        lmp = session.driver.interface._engine.lmp
+        steps, values = time_series(session, temperature)
+        np.testing.assert_array_equal(steps, [60, 80, 100])
+        self.assertEqual(values[-1], lmp.get_thermo("temp"))
+        self.assertEqual(temperature.lastValue, values[-1])
+        self.assertEqual(pressure.lastValue, lmp.get_thermo("press"))
+        self.assertNotEqual(pe.lastValue, 0)
+        self.assertAlmostEqual(etotal.lastValue, pe.lastValue + ke.lastValue)
+        _, energies = time_series(session, etotal.identifier)
+        self.assertEqual(len(set(energies)), 3)
+        self.assertFalse(atoms[0].get(oclass=simlammps.Velocity))
+
+        with session:
+            session.delete(pressure)
+        session.compute()
+        steps, values = time_series(session, temperature)
+        np.testing.assert_array_equal(steps, [80, 100, 200])
+        self.assertEqual(temperature.lastValue, values[-1])
+        self.assertRaises(KeyError, time_series, session, pressure.identifier)
+        self.assertRaises(TypeError, time_series, Session(), pe)
+
+        # Observables of no supported class are rejected before any change.
+        with session:
+            simlammps.Observable()
+            simlammps.Pressure()
+        self.assertRaises(ValueError, session.commit)
+        self.assertEqual(len(session.driver.interface._observables), 4)
+        session.close()
+
+    def test_atom_views(self):
+        """Tests reading the per-atom arrays of the engine in place."""
+        atoms = self.add_atom_grid(self.session)
+        views = []
+        self.session.compute(
+            chunk_size=50,
+            callback=lambda snapshot: views.append(snapshot.views().x[0]),
+        )
+        self.assertEqual(len(views), 2)
+
+        views = atom_views(self.session)
+        self.assertEqual(views.x.shape, (28, 3))
+        self.assertEqual(views.f.shape, (28, 3))
+        np.testing.assert_array_equal(views.type, 1)
+        self.assertTrue(np.shares_memory(views.v, atom_views(self.session).v))
+        with self.assertRaises(ValueError):
+            views.x[0] = 0
+        rows = {
+            identifier: i for i, identifier in enumerate(views.identifiers)
+        }
+        for atom in atoms:
+            np.testing.assert_array_equal(
+                views.x[rows[atom.identifier]],
+                atom.get(oclass=simlammps.Position).one().vector.data,
+            )
+            np.testing.assert_array_equal(
+                views.v[rows[atom.identifier]],
+                atom.get(oclass=simlammps.Velocity).one().vector.data,
+            )
+        self.assertRaises(TypeError, atom_views, Session())
+
+    def test_add_atoms(self):
+        """Tests adding atoms from arrays."""
+        material = self.session.get(oclass=simlammps.Material).one()
+        grid = np.mgrid[2:8:2, 2:8:2, 2:8:2].reshape(3, -1).T
+        velocities = np.tile((0.1, 0, 0), (27, 1))
+        identifiers = add_atoms(self.session, material, grid, velocities)
+        interface = self.session.driver.interface
+        self.assertEqual(interface._engine.lmp.get_natoms(), 28)
+        self.assertEqual(len(self.session.get(oclass=simlammps.Atom)), 1)
+        views = atom_views(self.session)
+        rows = {
+            identifier: i for i, identifier in enumerate(views.identifiers)
+        }
+        np.testing.assert_array_equal(
+            views.x[[rows[identifier] for identifier in identifiers]], grid
+        )
+
+        self.session.compute()
+        atoms = materialize_atoms(self.session)
+        self.assertEqual({atom.identifier for atom in atoms}, set(identifiers))
+        views = atom_views(self.session)
+        rows = {
+            identifier: i for i, identifier in enumerate(views.identifiers)
+        }
+        for atom in atoms:
+            np.testing.assert_array_equal(
+                atom.get(oclass=simlammps.Position).one().vector.data,
+                views.x[rows[atom.identifier]],
+            )
+            self.assertFalse(atom.get(oclass=simlammps.Force))
+
+        # Atoms with forces, added to the session right away.
+        forces = ((0.5, 0, 0), (0, 0.5, 0))
+        identifiers = add_atoms(
+            self.session,
+            material,
+            ((1, 5, 5), (5, 1, 5)),
+            forces=forces,
+            materialize=True,
+        )
+        for identifier, force in zip(identifiers, forces):
+            atom = self.session.from_identifier(identifier)
+            np.testing.assert_array_equal(
+                atom.get(oclass=simlammps.Force).one().vector.data, force
+            )
+            self.assertFalse(atom.get(oclass=simlammps.Velocity))
+        self.session.compute()
+        for identifier, force in zip(identifiers, forces):
+            atom = self.session.from_identifier(identifier)
+            np.testing.assert_allclose(
+                atom.get(oclass=simlammps.Force).one().vector.data, force
+            )
+        self.assertEqual(materialize_atoms(self.session), [])
+
+        self.assertRaises(
+            ValueError, add_atoms, self.session, material, grid[:, :2]
+        )
+        self.assertRaises(
+            ValueError, add_atoms, self.session, material, grid, grid[1:]
+        )
+
+        # Nothing is kept when the engine does not create all the atoms.
+        interface = self.session.driver.interface
+        count = len(interface._atom_mapper)
+        self.assertRaises(
+            RuntimeError,
+            interface._create_atoms,
+            [URIRef(f"https://www.example.org/atom/{i}") for i in (1, 2)],
+            np.ones(2, dtype=int),
+            np.ones((1, 3)),
+            np.zeros((2, 3)),
+        )
+        self.assertEqual(len(interface._atom_mapper), count)
+        self.assertEqual(interface._engine.lmp.get_natoms(), count)
+
+    def test_lattice(self):
+        """Tests filling regions and the box with lattices of atoms."""
+        material = self.session.get(oclass=simlammps.Material).one()
+        with self.session:
+            lattice = simlammps.FaceCenteredCubic(latticeConstant=2.5)
+            lattice[simlammps.hasPart] += {
+                material,
+                simlammps.Block(lowerCorner=(4, 4, 4), upperCorner=(9, 9, 9)),
+            }
+        self.session.commit()
+        interface = self.session.driver.interface
+        self.assertEqual(interface._engine.lmp.get_natoms(), 33)
+        self.assertEqual(len(interface._atom_mapper), 33)
+        self.assertEqual(len(self.session.get(oclass=simlammps.Atom)), 1)
+
+        # The atoms are on the sites of the lattice inside the block.
+        views = atom_views(self.session)
+        atom = self.session.get(oclass=simlammps.Atom).one()
+        created = [x != atom.identifier for x in views.identifiers]
+        sites = views.x[created] / 1.25
+        self.assertEqual(len(sites), 32)
+        self.assertTrue(np.all((sites >= 4) & (sites <= 7)))
+        np.testing.assert_allclose(sites, np.round(sites))
+        self.assertTrue(np.all(np.round(sites).sum(axis=1) % 2 == 0))
+
+        self.session.compute()
+        atoms = materialize_atoms(self.session)
+        self.assertEqual(len(atoms), 32)
+        views = atom_views(self.session)
+        rows = {
+            identifier: i for i, identifier in enumerate(views.identifiers)
+        }
+        for atom in atoms:
+            self.assertEqual(
+                atom.get(oclass=simlammps.Material).one(), material
+            )
+            np.testing.assert_array_equal(
+                atom.get(oclass=simlammps.Position).one().vector.data,
+                views.x[rows[atom.identifier]],
+            )
+
+        # Without a block, the lattice fills the whole box.
+        session = self.create_session()
+        with session:
+            lattice = simlammps.SimpleCubic(latticeConstant=2)
+            lattice[simlammps.hasPart] += session.get(
+                oclass=simlammps.Material
+            ).one()
+        session.compute()
+        self.assertEqual(
+            session.driver.interface._engine.lmp.get_natoms(), 126
+        )
+        self.assertEqual(len(materialize_atoms(session)), 125)
+
+        # Lattices of no supported class are rejected, and so is deleting
+        # a lattice, as its atoms would stay.
+        with session:
+            session.delete(lattice)
+        self.assertRaises(ValueError, session.commit)
+        session.close()
+
+        session = self.create_session()
+        with session:
+            simlammps.Lattice(latticeConstant=2)[
+                simlammps.hasPart
+            ] += session.get(oclass=simlammps.Material).one()
+        self.assertRaises(ValueError, session.commit)
+        self.assertEqual(session.driver.interface._engine.lmp.get_natoms(), 1)
+        session.close()
+
+    @unittest.skipUnless(shutil.which("mpirun"), "mpirun is not available")
+    def test_mpi(self):
+        """Tests running a simulation on two MPI ranks."""
+        self.add_atom_grid(self.session)
+        with TemporaryDirectory() as directory:
+            path = Path(directory) / "session.nt"
+            self.session.graph.serialize(path, format="nt", encoding="utf-8")
+            result = subprocess.run(
+                ["mpirun", "-n", "2", sys.executable, "-c", MPI_SCRIPT, path],
+                cwd=Path(__file__).parents[1],
+                env=os.environ,
+                stdout=subprocess.PIPE,
+                check=True,
+            )
+        result = json.loads(result.stdout.decode().splitlines()[-1])
+        self.session.compute()
+
+        self.assertEqual(result["ranks"], 2)
+        atoms = list(self.session.get(oclass=simlammps.Atom))
+        self.assertEqual(len(result["positions"]), 28)
+        np.testing.assert_allclose(
+            [result["positions"][str(atom.identifier)] for atom in atoms],
+            [
+                atom.get(oclass=simlammps.Position).one().vector.data
+                for atom in atoms
+            ],
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
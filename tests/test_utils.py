@@ -0,0 +1,254 @@
+"""Test the utilities of the LAMMPS wrapper."""
+
+import gzip
+import struct
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import numpy as np
+
+from simphony_osp_simlammps.utils import (
+    LAMMPSInputScript,
+    LAMMPSTrajectory,
+    RingBuffer,
+    TrajectoryFrame,
+)
+
+DATA_FILE = """LAMMPS data file
+
+5 atoms
+1 atom types
+
+0.0 10.0 xlo xhi
+0.0 20.0 ylo yhi
+0.0 30.0 zlo zhi
+
+Masses
+
+1 1.0
+
+Atoms # atomic
+
+1 1 1.0 1.5 2.0 0 0 0
+2 1 2.0 2.5 3.0 0 0 0 # comment
+5 1 3.0 3.5 4.0 0 0 0
+
+4 1 4.0 4.5 5.0 0 0 0
+3 1 5.0 5.5 6.0 0 0 0
+
+Velocities
+
+1 0.1 0.2 0.3
+2 1.1 1.2 1.3
+5 2.1 2.2 2.3
+4 3.1 3.2 3.3
+3 4.1 4.2 4.3
+"""
+
+
+class TestLAMMPSInputScript(unittest.TestCase):
+    """Test the parser for LAMMPS input scripts."""
+
+    def setUp(self):
+        """Write a small data file to parse."""
+        self.directory = TemporaryDirectory()
+        self.filename = str(Path(self.directory.name) / "data.lammps")
+        with open(self.filename, "w") as file:
+            file.write(DATA_FILE)
+        self.script = LAMMPSInputScript(self.filename)
+        self.script.parse()
+
+    def tearDown(self):
+        """Remove the data file."""
+        self.directory.cleanup()
+
+    def test_box_coordinates(self):
+        """Tests reading the box coordinates from the header."""
+        self.assertEqual(
+            self.script.box_coordinates(),
+            ((10.0, 0, 0), (0, 20.0, 0), (0, 0, 30.0)),
+        )
+
+    def test_iter_section(self):
+        """Tests reading a section in chunks."""
+        chunks = list(self.script.iter_section("Atoms", chunk_size=2))
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2, 1])
+        atoms = np.concatenate(chunks)
+        self.assertEqual(atoms.shape, (5, 8))
+        np.testing.assert_array_equal(atoms[:, 0], [1, 2, 5, 4, 3])
+        np.testing.assert_array_equal(atoms[1, 2:5], [2.0, 2.5, 3.0])
+        masses = np.concatenate(list(self.script.iter_section("Masses")))
+        np.testing.assert_array_equal(masses, [[1, 1.0]])
+
+    def test_atom_information_generator(self):
+        """Tests the iterator for the positions and velocities."""
+        self.script.CHUNK_SIZE = 3
+        information = list(self.script.atom_information_generator())
+        self.assertEqual(len(information), 5)
+        self.assertEqual(information[0], ([1.0, 1.5, 2.0], [0.1, 0.2, 0.3]))
+        self.assertEqual(information[4], ([5.0, 5.5, 6.0], [4.1, 4.2, 4.3]))
+
+        with open(self.filename, "w") as file:
+            file.write(DATA_FILE.rsplit("\n", 2)[0] + "\n")
+        self.script.parse()
+        self.assertRaises(
+            ValueError, list, self.script.atom_information_generator()
+        )
+
+    def test_load_section(self):
+        """Tests loading a section parsed in small windows."""
+        expected = np.concatenate(list(self.script.iter_section("Atoms")))
+        np.testing.assert_array_equal(
+            self.script.load_section("Atoms"), expected
+        )
+        self.script.WINDOW_SIZE = 30
+        np.testing.assert_array_equal(
+            self.script.load_section("Atoms"), expected
+        )
+        self.assertRaises(ValueError, self.script.load_section, "Bonds")
+
+    def test_load_atoms(self):
+        """Tests loading the atoms with velocities matched by atom id."""
+        header, velocities = DATA_FILE.split("Velocities")
+        velocities = "\n".join(sorted(velocities.strip().splitlines()))
+        with open(self.filename, "w") as file:
+            file.write(f"{header}Velocities\n\n{velocities}\n")
+        self.script.parse()
+
+        atoms = self.script.load_atoms()
+        self.assertEqual(atoms.dtype, LAMMPSInputScript.ATOM_DTYPE)
+        np.testing.assert_array_equal(atoms["id"], [1, 2, 5, 4, 3])
+        np.testing.assert_array_equal(atoms["type"], [1, 1, 1, 1, 1])
+        np.testing.assert_array_equal(atoms["x"], [1.0, 2.0, 3.0, 4.0, 5.0])
+        np.testing.assert_array_equal(atoms["z"], [2.0, 3.0, 4.0, 5.0, 6.0])
+        np.testing.assert_array_equal(atoms["vx"], [0.1, 1.1, 2.1, 3.1, 4.1])
+        np.testing.assert_array_equal(atoms["vz"], [0.3, 1.3, 2.3, 3.3, 4.3])
+
+    def test_load_atoms_empty(self):
+        """Tests loading the atoms of a data file without atoms."""
+        header = DATA_FILE.split("Atoms")[0].replace("5 atoms", "0 atoms")
+        with open(self.filename, "w") as file:
+            file.write(header)
+        self.script.parse()
+        atoms = self.script.load_atoms()
+        self.assertEqual(atoms.dtype, LAMMPSInputScript.ATOM_DTYPE)
+        self.assertEqual(len(atoms), 0)
+
+        with open(self.filename, "w") as file:
+            file.write(f"{header}Atoms # atomic\n\n")
+        self.script.parse()
+        self.assertEqual(len(self.script.load_atoms()), 0)
+
+
+TEXT_FRAME = """ITEM: TIMESTEP
+{step}
+ITEM: NUMBER OF ATOMS
+2
+ITEM: BOX BOUNDS pp pp pp
+0.0 10.0
+0.0 20.0
+0.0 30.0
+ITEM: ATOMS id x y z
+1 1.0 2.0 3.0
+2 4.0 5.0 {step}.0
+"""
+
+
+class TestLAMMPSTrajectory(unittest.TestCase):
+    """Test the reader for trajectories written by LAMMPS."""
+
+    def setUp(self):
+        """Create a directory for the trajectories."""
+        self.directory = TemporaryDirectory()
+        self.path = Path(self.directory.name) / "trajectory"
+
+    def tearDown(self):
+        """Remove the trajectories."""
+        self.directory.cleanup()
+
+    @staticmethod
+    def binary_frame(step: int) -> bytes:
+        """Write a frame as a binary `custom` dump of LAMMPS does.
+
+        Args:
+            step: timestep of the frame, also the z coordinate of atom 2.
+        """
+        columns = b"id x y z"
+        values = (1.0, 1.0, 2.0, 3.0, 2.0, 4.0, 5.0, float(step))
+        return b"".join(
+            (
+                struct.pack("=q", -len(LAMMPSTrajectory.MAGIC)),
+                LAMMPSTrajectory.MAGIC,
+                struct.pack("=2i2qi6i", 1, 2, step, 2, 0, *(0,) * 6),
+                struct.pack("=6d", 0, 10, 0, 20, 0, 30),
+                struct.pack("=2ibi", 4, 0, 0, len(columns)),
+                columns,
+                # Two chunks, as written by two MPI ranks.
+                struct.pack("=2i4d", 2, 4, *values[:4]),
+                struct.pack("=i4d", 4, *values[4:]),
+            )
+        )
+
+    def check_frames(self, frames):
+        """Check the frames written by `binary_frame` or `TEXT_FRAME`."""
+        self.assertEqual([frame.step for frame in frames], [0, 10])
+        self.assertIsInstance(frames[0], TrajectoryFrame)
+        np.testing.assert_array_equal(
+            frames[0].box, [(0, 10), (0, 20), (0, 30)]
+        )
+        self.assertEqual(frames[1].atoms.dtype.names, ("id", "x", "y", "z"))
+        np.testing.assert_array_equal(frames[1].atoms["id"], [1, 2])
+        np.testing.assert_array_equal(frames[1].atoms["z"], [3.0, 10.0])
+
+    def test_binary(self):
+        """Tests reading a binary dump, with an unfinished frame."""
+        data = self.binary_frame(0) + self.binary_frame(10)
+        self.path.write_bytes(data + self.binary_frame(20)[:-8])
+        self.check_frames(list(LAMMPSTrajectory(self.path)))
+        with open(self.path, "rb") as file:
+            self.check_frames(list(LAMMPSTrajectory(file)))
+
+        self.path.write_bytes(b"")
+        self.assertEqual(list(LAMMPSTrajectory(self.path)), [])
+        self.path.write_bytes(DATA_FILE.encode())
+        self.assertRaises(ValueError, list, LAMMPSTrajectory(self.path))
+
+    def test_compressed(self):
+        """Tests reading a compressed dump, with an unfinished frame."""
+        with gzip.open(self.path, "wt") as file:
+            file.write(TEXT_FRAME.format(step=0))
+            file.write(TEXT_FRAME.format(step=10))
+            file.write(TEXT_FRAME.format(step=20)[:-10])
+        self.check_frames(list(LAMMPSTrajectory(self.path)))
+
+
+class TestRingBuffer(unittest.TestCase):
+    """Test the time series that keep only their most recent samples."""
+
+    def test_ring_buffer(self):
+        """Tests recording more samples than fit in the buffer."""
+        buffer = RingBuffer(3)
+        self.assertEqual(len(buffer), 0)
+        for step in range(2):
+            buffer.append(step, step / 2)
+        steps, values = buffer.series()
+        np.testing.assert_array_equal(steps, [0, 1])
+        np.testing.assert_array_equal(values, [0, 0.5])
+
+        for step in range(2, 7):
+            buffer.append(step, step / 2)
+        self.assertEqual(len(buffer), 3)
+        steps, values = buffer.series()
+        np.testing.assert_array_equal(steps, [4, 5, 6])
+        np.testing.assert_array_equal(values, [2, 2.5, 3])
+        steps[:] = 0
+        np.testing.assert_array_equal(buffer.series()[0], [4, 5, 6])
+
+        buffer.clear()
+        self.assertEqual(len(buffer), 0)
+        self.assertRaises(ValueError, RingBuffer, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()